@@ -0,0 +1,191 @@
+"""Class-wide progress analytics from an append-only event log.
+
+Every XP award, streak change and answer outcome is appended to a JSON
+lines log as it happens, and folded into aggregates that are updated in
+constant time per event:
+
+* leaderboards of total XP earned and best streak, each a ``k``-entry
+  min-heap (scores only grow, so a learner enters by beating the heap's
+  minimum and nobody outside it can overtake without doing so);
+* answered/correct counters per category (grammar topic, "Letters",
+  "Words", "Conversations") and per level;
+* how many learners currently have a streak in each ``STREAK_BUCKETS``
+  range, moved one learner at a time as streaks change.
+
+``snapshot`` copies only these fixed-size structures, so the dashboard
+renders in the same time for a class of ten or ten thousand. The log is the
+source of truth: a server replays it once at startup to rebuild the
+aggregates, and other tools can read it line by line. Each event is one
+``write`` of one short line to a file opened for appending, so several
+server processes can share a log; each process's dashboard shows the
+events it has seen since it started, plus the replayed history.
+"""
+import atexit
+import heapq
+import json
+import os
+import threading
+import time
+
+DEFAULT_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "class_events.jsonl")
+TOP_K = 10
+# Lower bounds of the streak distribution buckets
+STREAK_BUCKETS = (0, 1, 3, 5, 10, 20)
+LETTER_CATEGORY = "Letters"
+WORD_CATEGORY = "Words"
+
+
+class TopK:
+    """The ``k`` highest scores, for scores that never decrease."""
+
+    def __init__(self, k=TOP_K):
+        self.k = k
+        self._heap = []  # [score, learner_id], lowest first
+        self._entries = {}
+
+    def update(self, learner_id, score):
+        entry = self._entries.get(learner_id)
+        if entry is not None:
+            entry[0] = score
+            heapq.heapify(self._heap)  # k entries, independent of class size
+        elif len(self._heap) < self.k:
+            entry = self._entries[learner_id] = [score, learner_id]
+            heapq.heappush(self._heap, entry)
+        elif score > self._heap[0][0]:
+            entry = self._entries[learner_id] = [score, learner_id]
+            del self._entries[heapq.heapreplace(self._heap, entry)[1]]
+
+    def items(self):
+        """Return ``(learner_id, score)`` pairs, highest first."""
+        return [(learner_id, score) for score, learner_id in sorted(self._heap, reverse=True)]
+
+
+class _Learner:
+    __slots__ = ("xp", "streak", "best_streak")
+
+    def __init__(self):
+        self.xp = 0
+        self.streak = 0
+        self.best_streak = 0
+
+
+def streak_bucket(streak):
+    for i in range(len(STREAK_BUCKETS) - 1, -1, -1):
+        if streak >= STREAK_BUCKETS[i]:
+            return i
+    return 0
+
+
+def bucket_label(i):
+    if i == len(STREAK_BUCKETS) - 1:
+        return f"{STREAK_BUCKETS[i]}+"
+    low, high = STREAK_BUCKETS[i], STREAK_BUCKETS[i + 1] - 1
+    return str(low) if low == high else f"{low}-{high}"
+
+
+class ClassAggregates:
+    """Leaderboards, per-category accuracy and the streak distribution, updated per event."""
+
+    def __init__(self, k=TOP_K):
+        self.learners = {}
+        self.top_xp = TopK(k)
+        self.top_streak = TopK(k)
+        self.categories = {}  # name -> [answered, correct]
+        self.levels = {}  # level -> [answered, correct]
+        self.streaks = [0] * len(STREAK_BUCKETS)
+        self.events = 0
+
+    def _learner(self, learner_id):
+        learner = self.learners.get(learner_id)
+        if learner is None:
+            learner = self.learners[learner_id] = _Learner()
+            self.streaks[0] += 1
+        return learner
+
+    def apply(self, event):
+        """Fold one event dict from the log into the aggregates."""
+        learner_id, kind = event["learner"], event["kind"]
+        learner = self._learner(learner_id)
+        if kind == "xp":
+            learner.xp += event["amount"]
+            self.top_xp.update(learner_id, learner.xp)
+        elif kind == "streak":
+            streak = event["streak"]
+            self.streaks[streak_bucket(learner.streak)] -= 1
+            self.streaks[streak_bucket(streak)] += 1
+            learner.streak = streak
+            if streak > learner.best_streak:
+                learner.best_streak = streak
+                self.top_streak.update(learner_id, streak)
+        elif kind == "answer":
+            correct = int(event["correct"])
+            for totals, key in ((self.categories, event.get("category")), (self.levels, event.get("level"))):
+                counts = totals.get(key)
+                if counts is None:
+                    counts = totals[key] = [0, 0]
+                counts[0] += 1
+                counts[1] += correct
+        self.events += 1
+
+    def snapshot(self):
+        """Return the dashboard's data; its size depends on ``k`` and the categories, not the class."""
+        return {
+            "learners": len(self.learners),
+            "events": self.events,
+            "top_xp": self.top_xp.items(),
+            "top_streak": self.top_streak.items(),
+            "categories": sorted((str(name), *counts) for name, counts in self.categories.items()),
+            "levels": sorted((level, *counts) for level, counts in self.levels.items() if level is not None),
+            "streaks": [(bucket_label(i), count) for i, count in enumerate(self.streaks)],
+        }
+
+
+class ClassAnalytics:
+    """Process-wide event log and aggregates, safe to share across sessions."""
+
+    def __init__(self, path=DEFAULT_LOG_PATH, k=TOP_K):
+        self.path = path
+        self.aggregates = ClassAggregates(k)
+        self._lock = threading.Lock()
+        self.replayed = self._replay()
+        self._log = open(path, "a", encoding="utf-8", buffering=1) if path else None
+        atexit.register(self.close)
+
+    def _replay(self):
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    self.aggregates.apply(json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    continue  # A line cut short by a crash
+        return self.aggregates.events
+
+    def record(self, learner_id, kind, **fields):
+        """Append an event to the log and apply it to the aggregates."""
+        event = {"t": round(time.time(), 3), "learner": learner_id, "kind": kind, **fields}
+        line = json.dumps(event, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._log is not None:
+                self._log.write(line)
+            self.aggregates.apply(event)
+
+    def earn_xp(self, learner_id, amount):
+        self.record(learner_id, "xp", amount=amount)
+
+    def streak(self, learner_id, streak):
+        self.record(learner_id, "streak", streak=streak)
+
+    def answer(self, learner_id, level, category, correct):
+        self.record(learner_id, "answer", level=level, category=category, correct=bool(correct))
+
+    def snapshot(self):
+        with self._lock:
+            return self.aggregates.snapshot()
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
@@ -0,0 +1,146 @@
+"""Fuzzy matching of typed answers against a prompt's accepted responses.
+
+Both the learner's answer and every accepted response go through the same
+``normalize``: Unicode quotes and dashes become ASCII, contractions are
+expanded ("I’m" and "Im" both become "i am"), punctuation is dropped and
+whitespace collapsed. An exact match after normalization scores 1.0.
+
+Otherwise the answer is compared with every accepted response at once.
+``AnswerMatcher`` precomputes, per prompt, a matrix of hashed character
+trigram counts and one of hashed word unigram and bigram counts, each
+response L2-normalized. Scoring an answer gathers just the rows for its own
+features and takes two small vector-matrix products, so it stays well under
+a millisecond with hundreds of accepted variants.
+"""
+import re
+import unicodedata
+import zlib
+from typing import NamedTuple
+
+import numpy as np
+
+# Hashed feature space per matrix; collisions only ever raise a score slightly
+FEATURES = 2048
+# Weight of character trigrams against word n-grams in the blended score
+CHAR_WEIGHT = 0.6
+# Scores at or above these count as an accepted answer / a close attempt
+ACCEPT_SCORE = 0.8
+CLOSE_SCORE = 0.5
+
+PUNCTUATION = str.maketrans({
+    "‘": "'", "’": "'", "‚": "'", "‛": "'", "′": "'", "`": "'", "´": "'",
+    "“": '"', "”": '"', "„": '"', "″": '"',
+    "‐": "-", "‑": "-", "‒": "-", "–": "-", "—": "-", "−": "-",
+    "…": " ", " ": " ",
+})
+CONTRACTIONS = {
+    "i'm": "i am", "im": "i am", "i've": "i have", "ive": "i have", "i'll": "i will", "i'd": "i would",
+    "you're": "you are", "youre": "you are", "you've": "you have", "you'll": "you will", "you'd": "you would",
+    "we're": "we are", "we've": "we have", "we'll": "we will",
+    "they're": "they are", "theyre": "they are", "they've": "they have", "they'll": "they will",
+    "he's": "he is", "she's": "she is", "it's": "it is", "that's": "that is", "thats": "that is",
+    "what's": "what is", "whats": "what is", "where's": "where is", "there's": "there is",
+    "here's": "here is", "who's": "who is", "how's": "how is", "let's": "let us", "lets": "let us",
+    "can't": "cannot", "cant": "cannot", "won't": "will not", "wont": "will not",
+    "don't": "do not", "dont": "do not", "doesn't": "does not", "doesnt": "does not",
+    "didn't": "did not", "didnt": "did not", "isn't": "is not", "isnt": "is not",
+    "aren't": "are not", "arent": "are not", "wasn't": "was not", "wasnt": "was not",
+    "weren't": "were not", "haven't": "have not", "havent": "have not", "hasn't": "has not",
+    "couldn't": "could not", "couldnt": "could not", "shouldn't": "should not", "shouldnt": "should not",
+    "wouldn't": "would not", "wouldnt": "would not", "gonna": "going to", "wanna": "want to",
+}
+WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)*")
+
+
+def normalize(text):
+    """Return ``text`` lowercased, with ASCII punctuation, contractions expanded and no punctuation."""
+    text = unicodedata.normalize("NFKC", text).translate(PUNCTUATION).lower()
+    words = []
+    for word in WORD.findall(text):
+        expanded = CONTRACTIONS.get(word)
+        if expanded is None:
+            # Other apostrophes (possessives like "john's") are simply dropped on both sides
+            expanded = word.replace("'", "")
+        words.append(expanded)
+    return " ".join(words)
+
+
+def _bucket(feature):
+    return zlib.crc32(feature.encode()) % FEATURES
+
+
+def _char_features(normalized):
+    padded = f" {normalized} "
+    return [_bucket(padded[i:i + 3]) for i in range(len(padded) - 2)]
+
+
+def _word_features(normalized):
+    words = normalized.split()
+    return [_bucket(w) for w in words] + [_bucket(f"{a} {b}") for a, b in zip(words, words[1:])]
+
+
+def _vectors(feature_lists):
+    """Return the L2-normalized count vectors as a (FEATURES, len(feature_lists)) matrix.
+
+    Stored feature-major so scoring gathers only the rows an answer uses.
+    """
+    matrix = np.zeros((len(feature_lists), FEATURES), np.float32)
+    rows = np.repeat(np.arange(len(feature_lists)), [len(f) for f in feature_lists])
+    cols = np.fromiter((b for f in feature_lists for b in f), np.intp, len(rows))
+    np.add.at(matrix, (rows, cols), 1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.ascontiguousarray((matrix / np.maximum(norms, 1e-9)).T)
+
+
+def _cosines(index, features):
+    """Cosine similarity of one answer's features with every indexed response."""
+    if not features:
+        return np.zeros(index.shape[1], np.float32)
+    buckets, counts = np.unique(np.array(features), return_counts=True)
+    counts = counts.astype(np.float32)
+    return counts @ index[buckets] / np.linalg.norm(counts)
+
+
+class Match(NamedTuple):
+    score: float  # 0 to 1; 1.0 only for an exact match after normalization
+    response: str  # Closest accepted response, as written in the lesson
+
+    @property
+    def exact(self):
+        return self.score == 1.0
+
+    @property
+    def accepted(self):
+        return self.score >= ACCEPT_SCORE
+
+    @property
+    def close(self):
+        """A near miss: worth encouragement, not full credit."""
+        return self.score >= CLOSE_SCORE
+
+
+class AnswerMatcher:
+    """Index of one prompt's accepted responses, built once and shared."""
+
+    def __init__(self, responses):
+        self.responses = tuple(responses)
+        self.normalized = [normalize(r) for r in self.responses]
+        self._exact = {}
+        for index, normalized in enumerate(self.normalized):
+            self._exact.setdefault(normalized, index)
+        self._chars = _vectors([_char_features(n) for n in self.normalized])
+        self._words = _vectors([_word_features(n) for n in self.normalized])
+
+    def match(self, answer):
+        """Return the best ``Match`` for ``answer`` among the accepted responses."""
+        normalized = normalize(answer)
+        index = self._exact.get(normalized)
+        if index is not None:
+            return Match(1.0, self.responses[index])
+        if not normalized or not self.responses:
+            return Match(0.0, self.responses[0] if self.responses else "")
+        scores = (CHAR_WEIGHT * _cosines(self._chars, _char_features(normalized))
+                  + (1 - CHAR_WEIGHT) * _cosines(self._words, _word_features(normalized)))
+        best = int(scores.argmax())
+        # Keep inexact matches strictly below an exact one
+        return Match(min(float(scores[best]), 0.99), self.responses[best])
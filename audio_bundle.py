@@ -0,0 +1,145 @@
+"""Pre-rendered lesson audio packed into a single indexed file.
+
+All pronunciation text in the lessons is known ahead of time, so it can be
+synthesized once at build time and served at runtime without touching the
+TTS service. The bundle layout is::
+
+    header   magic "AETB", format version, entry count
+    index    one (key hash, offset, length) record per clip, sorted by hash
+    data     the clips, back to back
+
+The reader maps the file with ``mmap`` and slices clips out of it, so every
+server process shares the same page cache.
+
+Build it with::
+
+    python audio_bundle.py build
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+
+import lessons
+from tts_backends import DEFAULT_BACKEND, get_backend
+
+MAGIC = b"AETB"
+VERSION = 1
+HEADER = struct.Struct("<4sII")
+RECORD = struct.Struct("<16sQI")
+DEFAULT_BUNDLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lesson_audio.bundle")
+
+
+def key_hash(key):
+    """Return the 16-byte index hash for a ``(backend, text, lang, slow)`` key."""
+    return hashlib.sha256(repr(key).encode("utf-8")).digest()[:16]
+
+
+def write_bundle(path, entries):
+    """Write ``(key, audio_bytes)`` pairs to ``path`` as a bundle."""
+    clips = {}
+    for key, data in entries:
+        clips[key_hash(key)] = data
+    hashes = sorted(clips)
+
+    offset = HEADER.size + RECORD.size * len(hashes)
+    index = []
+    for h in hashes:
+        index.append(RECORD.pack(h, offset, len(clips[h])))
+        offset += len(clips[h])
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(hashes)))
+            f.writelines(index)
+            for h in hashes:
+                f.write(clips[h])
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return len(hashes)
+
+
+class AudioBundle:
+    """Read-only, memory-mapped view of a bundle file."""
+
+    def __init__(self, path=DEFAULT_BUNDLE_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            raise ValueError(f"{path} is not an audio bundle")
+        magic, version, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} audio bundle")
+        self._index = {}
+        for i in range(count):
+            h, offset, length = RECORD.unpack_from(self._mm, HEADER.size + i * RECORD.size)
+            self._index[h] = (offset, length)
+        # Unlocked counters: a lost increment under contention only skews the hit rate slightly
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key_hash(key) in self._index
+
+    def get(self, key):
+        """Return the audio bytes for ``key``, or None if it was not pre-rendered."""
+        entry = self._index.get(key_hash(key))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        offset, length = entry
+        return self._mm[offset:offset + length]
+
+    def stats(self):
+        """Return hit/miss counters and the number of clips in the bundle."""
+        return {"hits": self.hits, "misses": self.misses, "items": len(self._index)}
+
+
+def build(path, backend, lang="en", slow=False):
+    """Render every lesson text with ``backend`` and write the bundle to ``path``."""
+    texts = lessons.pronunciation_texts()
+    clips = backend.synthesize_many(texts, lang, slow)
+    return write_bundle(path, (((backend.name, text, lang, slow), clip) for text, clip in zip(texts, clips)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect the pre-rendered lesson audio bundle.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_cmd = commands.add_parser("build", help="render all lesson audio into a bundle")
+    build_cmd.add_argument("--out", default=DEFAULT_BUNDLE_PATH)
+    build_cmd.add_argument("--lang", default="en")
+    build_cmd.add_argument("--backend", default=None, help="TTS backend (default: $TTS_BACKEND or gtts)")
+    info_cmd = commands.add_parser("info", help="show the contents of a bundle")
+    info_cmd.add_argument("path", nargs="?", default=DEFAULT_BUNDLE_PATH)
+    info_cmd.add_argument("--backend", default=None, help="backend the bundle is expected to hold")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        count = build(args.out, get_backend(args.backend), lang=args.lang)
+        print(f"Wrote {count} clips to {args.out} in {time.perf_counter() - start:.1f}s")
+    else:
+        bundle = AudioBundle(args.path)
+        backend_name = args.backend or os.environ.get("TTS_BACKEND", DEFAULT_BACKEND)
+        missing = [t for t in lessons.pronunciation_texts() if (backend_name, t, "en", False) not in bundle]
+        print(f"{args.path}: {len(bundle)} clips, {os.path.getsize(args.path)} bytes")
+        if missing:
+            print(f"{len(missing)} lesson texts are not in the bundle; rebuild it.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
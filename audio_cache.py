@@ -0,0 +1,140 @@
+"""Two-tier cache for synthesized speech audio.
+
+The first tier is a bounded in-memory LRU keyed by ``(text, lang, slow)``.
+The second tier is a content-addressed directory on disk: every clip is
+stored under the SHA-256 of its key, so server restarts and other worker
+processes reuse earlier renders. The disk tier is trimmed oldest-first once
+it grows past ``max_disk_bytes``.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "ai_english_tts_cache")
+
+
+class AudioCache:
+    """Thread-safe audio cache shared by every Streamlit session."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_items=256, max_disk_bytes=64 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_items = max_items
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._disk_bytes = sum(entry.stat().st_size for entry in self._disk_entries())
+
+    @staticmethod
+    def digest(key):
+        """Return the content address used for ``key`` on disk."""
+        return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+    def peek(self, key):
+        """Return the audio for ``key`` if it is in memory, without touching disk or rendering."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+            return data
+
+    def get_or_create(self, key, render):
+        """Return the audio bytes for ``key``, calling ``render()`` only on a miss."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+
+        path = os.path.join(self.cache_dir, self.digest(key) + ".bin")
+        data = self._read(path)
+        if data is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            data = render()
+            self._write(path, data)
+            with self._lock:
+                self.misses += 1
+
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+        return data
+
+    def stats(self):
+        """Return hit/miss counters and current tier sizes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_items": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def _read(self, path):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # Mark as recently used for eviction
+        except OSError:
+            pass
+        return data
+
+    def _write(self, path, data):
+        # Write to a temp file first so readers never see a partial clip
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._disk_bytes += len(data)
+            over_budget = self._disk_bytes > self.max_disk_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _disk_entries(self):
+        return [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".bin")]
+
+    def _evict_disk(self):
+        """Delete least recently used clips until the store is under 90% of its budget."""
+        entries = []
+        for entry in self._disk_entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_disk_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
@@ -0,0 +1,77 @@
+"""Cost of class analytics per event and per dashboard view as the class grows.
+
+Feeds a random stream of XP, streak and answer events for classes of
+growing size through ``ClassAnalytics`` (writing a real log to a temporary
+directory), then reports µs per recorded event, µs per dashboard snapshot
+and how fast a restarted server replays the log. Run from the repository
+root::
+
+    python -m benchmarks.bench_analytics
+    python -m benchmarks.bench_analytics --learners 100 10000 100000 --events 200000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from analytics import ClassAnalytics
+
+CATEGORIES = ["Letters", "Words", "Present Tense", "Past Tense", "Articles", "Pronouns", "Conversations"]
+
+
+def feed(analytics, learners, events, rng):
+    """Record about ``events`` events as learners answer; returns seconds spent recording."""
+    ids = [f"{rng.getrandbits(64):016x}" for _ in range(learners)]
+    streaks = dict.fromkeys(ids, 0)
+    seconds = 0.0
+    for _ in range(events // 3):
+        learner = rng.choice(ids)
+        correct = rng.random() < 0.7
+        level = rng.randint(1, 4)
+        streak = streaks[learner] + 1 if correct else 0
+        start = time.perf_counter()
+        if correct:
+            analytics.earn_xp(learner, 2 + level)
+        if streak != streaks[learner]:
+            analytics.streak(learner, streak)
+        analytics.answer(learner, level, rng.choice(CATEGORIES), correct)
+        seconds += time.perf_counter() - start
+        streaks[learner] = streak
+    return seconds
+
+
+def run(learners, events, seed=0):
+    """Return (µs per event, µs per snapshot, events replayed per second) for one class size."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "events.jsonl")
+        analytics = ClassAnalytics(path)
+        seconds = feed(analytics, learners, events, random.Random(seed))
+        recorded = analytics.aggregates.events
+        start = time.perf_counter()
+        for _ in range(1000):
+            analytics.snapshot()
+        snapshot_us = (time.perf_counter() - start) / 1000 * 1e6
+        analytics.close()
+
+        start = time.perf_counter()
+        restarted = ClassAnalytics(path)
+        replay_seconds = time.perf_counter() - start
+        restarted.close()
+    return seconds / recorded * 1e6, snapshot_us, restarted.replayed / replay_seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--learners", type=int, nargs="*", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--events", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    print(f"{'learners':>9} {'event µs':>9} {'snapshot µs':>12} {'replay events/s':>16}")
+    for learners in args.learners:
+        event_us, snapshot_us, replay_rate = run(learners, args.events)
+        print(f"{learners:>9} {event_us:>9.2f} {snapshot_us:>12.1f} {replay_rate:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
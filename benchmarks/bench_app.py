@@ -0,0 +1,298 @@
+"""Headless benchmarks of the app's hot paths, written to JSON for comparison.
+
+Times, on synthetic handwriting canvases rendered from system fonts:
+
+* ``recognize/<pipeline>/<stage>`` - each preprocessing stage (crop,
+  resize, denoise, threshold, morphology, contour) and the classifier and
+  Tesseract OCR calls, for the letter pipelines and the word pipeline;
+* ``tts/...`` - ``text_to_speech``'s cache paths with the stub backend:
+  a cold synthesis, a memory hit and a disk hit;
+* ``check/level<n>`` - answer matching in levels 3 and 4 (levels 1 and 2
+  check answers by recognition, covered above);
+* ``app/...`` - a full rerun of the app's script for every level and a
+  wrong typed answer checked in each level, through Streamlit's
+  ``AppTest``. Levels 1 and 2 only have a typed answer box when
+  handwriting recognition is unavailable.
+
+Steps whose dependencies are missing (no Tesseract, no exported letter
+model, no canvas component) are recorded with an ``error`` instead of
+failing the run. Run from the repository root::
+
+    python -m benchmarks.bench_app --out bench.json
+    python -m benchmarks.bench_app --out new.json --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import handwriting
+import lessons
+from audio_cache import AudioCache
+from tts_backends import StubBackend
+from benchmarks.canvases import LETTER_CANVAS, WORD_CANVAS, canvas_set
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+LEVEL_NAMES = list(lessons.LEVELS)
+# Typed answer box per level; levels 1 and 2 only show one when handwriting recognition is unavailable
+ANSWER_BOXES = dict(zip(LEVEL_NAMES, ["letter_input_0", "word_input", "sentence_input", "dialogue_input"]))
+
+
+def summarize(samples):
+    """Return count, mean and percentiles in milliseconds for a list of durations in seconds."""
+    ms = np.asarray(samples, dtype=np.float64) * 1000
+    return {
+        "n": int(ms.size),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "min_ms": round(float(ms.min()), 4),
+    }
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+class Recorder:
+    """Collects samples per benchmark name and failures for steps that cannot run."""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+
+    def add(self, name, seconds):
+        self.samples.setdefault(name, []).append(seconds)
+
+    def fail(self, name, error):
+        self.errors[name] = f"{type(error).__name__}: {error}"
+
+    def results(self):
+        results = {name: summarize(samples) for name, samples in self.samples.items()}
+        results.update({name: {"error": error} for name, error in self.errors.items()})
+        return dict(sorted(results.items()))
+
+
+# Recognition
+
+def bench_recognition(rec, count):
+    letters = canvas_set(list(lessons.ALPHABET), LETTER_CANVAS, count)
+    words = canvas_set(list(lessons.WORDS), WORD_CANVAS, count, seed=1)
+
+    preprocessed = []
+    for mode in handwriting.PREPROCESSORS:
+        for _, frame in letters:
+            timings = {}
+            seconds, image = timed(handwriting.preprocess, frame, mode, timings)
+            for stage, stage_seconds in timings.items():
+                rec.add(f"recognize/{mode}/{stage}", stage_seconds)
+            rec.add(f"recognize/{mode}/total", seconds)
+            if mode == handwriting.DEFAULT_PREPROCESS_MODE and image is not None:
+                preprocessed.append(image)
+
+    word_images = []
+    for _, frame in words:
+        timings = {}
+        seconds, image = timed(handwriting.preprocess_word, frame, timings)
+        for stage, stage_seconds in timings.items():
+            rec.add(f"recognize/word/{stage}", stage_seconds)
+        seconds_seg, (glyphs, _) = timed(handwriting.segment_glyphs, image)
+        rec.add("recognize/word/segment", seconds_seg)
+        rec.add("recognize/word/total", seconds + seconds_seg)
+        word_images.append((image, glyphs))
+
+    from letter_classifier import DEFAULT_MODEL_PATH, load_classifier
+
+    classifier = load_classifier(os.environ.get("LETTER_MODEL_PATH", DEFAULT_MODEL_PATH))
+    if classifier is None:
+        rec.fail("recognize/classifier", FileNotFoundError("no exported letter model"))
+    else:
+        for image in preprocessed:
+            rec.add("recognize/classifier/letter", timed(classifier.predict, [image])[0])
+        for _, glyphs in word_images:
+            if glyphs:
+                rec.add("recognize/classifier/word", timed(classifier.predict, glyphs)[0])
+
+    try:
+        import ocr_engine
+
+        letter_engine = ocr_engine.create_engine(size=1)
+        line_engine = ocr_engine.create_engine(size=1, psm=ocr_engine.LINE_PSM)
+        for image in preprocessed:
+            rec.add("recognize/ocr/letter", timed(letter_engine.recognize, image)[0])
+        for image, _ in word_images:
+            rec.add("recognize/ocr/word", timed(line_engine.recognize_chars, image)[0])
+    except Exception as e:
+        rec.fail("recognize/ocr", e)
+
+
+# Text to speech
+
+def bench_tts(rec, count):
+    backend = StubBackend()
+    texts = [f"{word} number {i}" for i, word in zip(range(count), random.Random(0).choices(list(lessons.WORDS), k=count))]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = AudioCache(cache_dir)
+        for text in texts:
+            key = (backend.name, text, "en", False)
+            rec.add("tts/cold", timed(cache.get_or_create, key, lambda: backend.synthesize(text))[0])
+        for text in texts:
+            key = (backend.name, text, "en", False)
+            rec.add("tts/memory_hit", timed(cache.get_or_create, key, lambda: backend.synthesize(text))[0])
+        # A fresh cache on the same directory is what a restarted server sees
+        disk_cache = AudioCache(cache_dir)
+        for text in texts:
+            key = (backend.name, text, "en", False)
+            rec.add("tts/disk_hit", timed(disk_cache.get_or_create, key, lambda: backend.synthesize(text))[0])
+
+
+# Answer checking
+
+def bench_checks(rec, count):
+    """Time exact and near-miss answers against every sentence and dialogue's matcher."""
+    from answer_matching import AnswerMatcher
+
+    rng = random.Random(0)
+    sentences = [(s, AnswerMatcher([s["answer"]])) for s in lessons.SENTENCES]
+    dialogues = [(d, AnswerMatcher(d["responses"])) for d in lessons.DIALOGUES]
+    for _ in range(count):
+        sentence, matcher = rng.choice(sentences)
+        rec.add("check/level3_exact", timed(matcher.match, sentence["answer"].upper())[0])
+        rec.add("check/level3_miss", timed(matcher.match, sentence["answer"] + "s")[0])
+        dialogue, matcher = rng.choice(dialogues)
+        rec.add("check/level4_exact", timed(matcher.match, rng.choice(dialogue["responses"]))[0])
+        rec.add("check/level4_fuzzy", timed(matcher.match, rng.choice(dialogue["responses"]).lower() + " yes")[0])
+
+
+# Full app reruns
+
+def bench_app(rec, count):
+    from streamlit.testing.v1 import AppTest
+
+    # A trivial script gives the harness's own cost per run, to subtract by eye
+    at = AppTest.from_string("import streamlit as st\nst.write('hi')", default_timeout=60)
+    at.run()
+    for _ in range(count):
+        rec.add("app/harness_baseline", timed(at.run)[0])
+
+    for level in LEVEL_NAMES:
+        name = "app/rerun/level" + level.split()[1]
+        at = AppTest.from_file(APP_PATH, default_timeout=60)
+        at.query_params["learner"] = "benchmark"
+        at.run()
+        at.selectbox(key="main_level_select").select(level).run()
+        if at.exception:
+            rec.fail(name, RuntimeError(at.exception[0].message))
+            continue
+        for _ in range(count):
+            rec.add(name, timed(at.run)[0])
+
+        # Submitting a wrong answer checks it without moving to the next item
+        box = ANSWER_BOXES[level]
+        if any(widget.key == box for widget in at.text_input):
+            for i in range(count):
+                at.text_input(key=box).input(f"not the answer {i}")
+                rec.add(name.replace("rerun", "check"), timed(at.button[0].click().run)[0])
+
+
+BENCHES = {
+    "recognize": bench_recognition,
+    "tts": bench_tts,
+    "check": bench_checks,
+    "app": bench_app,
+}
+
+
+def metadata():
+    def version(module):
+        try:
+            return __import__(module).__version__
+        except Exception:
+            return None
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "versions": {m: version(m) for m in ("numpy", "cv2", "streamlit", "pytesseract")},
+    }
+
+
+def compare(results, baseline_path, threshold):
+    """Print p50 ratios against a previous run; returns the names that regressed."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressed = []
+    print(f"\n{'benchmark':<36} {'old p50':>10} {'new p50':>10} {'ratio':>7}")
+    for name, stats in results.items():
+        old = baseline.get(name, {})
+        if "p50_ms" not in stats or "p50_ms" not in old:
+            continue
+        ratio = stats["p50_ms"] / max(old["p50_ms"], 1e-6)
+        flag = "  <-- slower" if ratio > threshold else ""
+        print(f"{name:<36} {old['p50_ms']:>10.3f} {stats['p50_ms']:>10.3f} {ratio:>7.2f}{flag}")
+        if ratio > threshold:
+            regressed.append(name)
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="*", choices=list(BENCHES), default=list(BENCHES))
+    parser.add_argument("--count", type=int, default=20, help="samples per benchmark")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="p50 ratio above which --compare reports a regression (exit status 1)")
+    args = parser.parse_args(argv)
+
+    # Keep the app off the network and away from the real caches, progress database and class log
+    workdir = tempfile.mkdtemp(prefix="bench_app_")
+    os.environ["TTS_BACKEND"] = "stub"
+    os.environ["TTS_CACHE_DIR"] = os.path.join(workdir, "tts")
+    os.environ["PROGRESS_DB"] = os.path.join(workdir, "progress.db")
+    os.environ["ANALYTICS_LOG"] = os.path.join(workdir, "class_events.jsonl")
+
+    rec = Recorder()
+    for name in args.only:
+        start = time.perf_counter()
+        try:
+            BENCHES[name](rec, args.count)
+        except Exception as e:
+            rec.fail(name, e)
+        print(f"{name}: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    results = rec.results()
+    print(f"{'benchmark':<36} {'p50 ms':>10} {'p95 ms':>10}")
+    for name, stats in results.items():
+        if "error" in stats:
+            print(f"{name:<36} {'-':>10} {'-':>10}  {stats['error']}")
+        else:
+            print(f"{name:<36} {stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"meta": metadata(), "results": results}, f, indent=2)
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""Latency of fuzzy answer matching as the number of accepted responses grows.
+
+Builds one ``AnswerMatcher`` per size from generated reply variants and
+reports the build time and the mean time to score a near-miss answer (the
+slow path; exact matches are a dict lookup). Run from the repository root::
+
+    python -m benchmarks.bench_matching
+    python -m benchmarks.bench_matching --sizes 10 100 1000 --answers 5000
+"""
+import argparse
+import random
+import time
+
+from answer_matching import AnswerMatcher
+
+OPENERS = ["I'm", "I am", "Doing", "Feeling", "Honestly I'm", "Pretty", "Really", "Not bad,"]
+MIDDLES = ["good", "great", "fine", "well", "okay", "awesome", "tired but happy", "not too bad"]
+CLOSERS = ["thanks!", "and you?", "how about you?", "thank you.", "!", "today.", "as always.", ""]
+
+
+def variants(count, rng):
+    """Return ``count`` reply variants, like the accepted answers of a dialogue prompt."""
+    return [f"{rng.choice(OPENERS)} {rng.choice(MIDDLES)} {rng.choice(CLOSERS)} {i}" for i in range(count)]
+
+
+def run(size, answers, seed=0):
+    """Return (ms to build the index, µs per match) for ``size`` accepted responses."""
+    rng = random.Random(seed)
+    responses = variants(size, rng)
+    start = time.perf_counter()
+    matcher = AnswerMatcher(responses)
+    build = time.perf_counter() - start
+    attempts = [f"{rng.choice(OPENERS)} {rng.choice(MIDDLES)}z {rng.choice(CLOSERS)}" for _ in range(answers)]
+    start = time.perf_counter()
+    for attempt in attempts:
+        matcher.match(attempt)
+    return build * 1000, (time.perf_counter() - start) / answers * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[3, 30, 300, 3000])
+    parser.add_argument("--answers", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    print(f"{'responses':>10} {'build ms':>10} {'match µs':>10}")
+    for size in args.sizes:
+        build_ms, match_us = run(size, args.answers)
+        print(f"{size:>10} {build_ms:>10.2f} {match_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
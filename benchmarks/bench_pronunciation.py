@@ -0,0 +1,79 @@
+"""Latency of pronunciation scoring as utterances get longer.
+
+Synthesizes a reference clip per length with the stub TTS backend, makes a
+learner attempt from it (10% slower, quieter, with background noise) and
+reports the time to extract features and to align them, plus the batch
+throughput of ``score_many``. Run from the repository root::
+
+    python -m benchmarks.bench_pronunciation
+    python -m benchmarks.bench_pronunciation --seconds 1 5 20 --repeat 20
+"""
+import argparse
+import io
+import time
+import wave
+
+import numpy as np
+
+from pronunciation import SAMPLE_RATE, PronunciationScorer, decode_audio, dtw_distance, features
+from tts_backends import StubBackend
+
+
+def attempt(reference, rng, stretch=1.1):
+    """Return a learner-like WAV of ``reference`` samples: slower, quieter and noisy."""
+    positions = np.arange(0, len(reference) - 1, 1 / stretch)
+    samples = 0.6 * np.interp(positions, np.arange(len(reference)), reference)
+    samples += 0.01 * rng.standard_normal(len(samples))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def text_of(seconds):
+    # The stub backend speaks 60 ms per character
+    return ("hello world " * 1000)[: max(1, int(seconds / 0.06))]
+
+
+def run(seconds, repeat, seed=0):
+    """Return (ms for features, ms for DTW, ms per clip in a batch) for clips about ``seconds`` long."""
+    backend = StubBackend()
+    text = text_of(seconds)
+    reference = decode_audio(backend.synthesize(text))
+    clip = attempt(reference, np.random.default_rng(seed))
+
+    reference_features = features(reference)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        query = features(decode_audio(clip))
+    features_ms = (time.perf_counter() - start) / repeat * 1000
+    start = time.perf_counter()
+    for _ in range(repeat):
+        dtw_distance(query, reference_features)
+    dtw_ms = (time.perf_counter() - start) / repeat * 1000
+
+    scorer = PronunciationScorer(lambda text: backend.synthesize(text))
+    scorer.reference(text)
+    start = time.perf_counter()
+    scorer.score_many([(clip, text)] * repeat)
+    batch_ms = (time.perf_counter() - start) / repeat * 1000
+    return features_ms, dtw_ms, batch_ms
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, nargs="*", default=[0.5, 2, 5, 10])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print(f"{'seconds':>8} {'features ms':>12} {'dtw ms':>8} {'batch ms/clip':>14}")
+    for seconds in args.seconds:
+        features_ms, dtw_ms, batch_ms = run(seconds, args.repeat)
+        print(f"{seconds:>8.1f} {features_ms:>12.2f} {dtw_ms:>8.2f} {batch_ms:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Selection and grading latency of the spaced-repetition scheduler.
+
+Simulates a learner working through banks of growing size and reports the
+mean cost of ``next_item`` and ``grade``, plus the memory held by one
+learner's scheduler. Run from the repository root::
+
+    python -m benchmarks.bench_scheduler
+    python -m benchmarks.bench_scheduler --sizes 1000 100000 1000000 --reviews 50000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from scheduler import ReviewScheduler
+
+
+def simulate(scheduler, reviews, rng):
+    """Answer ``reviews`` items; returns total seconds spent selecting and grading."""
+    now = 0.0
+    select_time = grade_time = 0.0
+    for _ in range(reviews):
+        start = time.perf_counter()
+        item_id = scheduler.next_item(now)
+        select_time += time.perf_counter() - start
+        start = time.perf_counter()
+        scheduler.grade(item_id, rng.random() < 0.8, now)
+        grade_time += time.perf_counter() - start
+        now += 30  # One answer every 30 seconds of simulated time
+    return select_time, grade_time
+
+
+def run(bank_size, reviews, seed=0):
+    """Return (µs per selection, µs per grade, KiB held) for one simulated learner."""
+    item_ids = tuple(range(1, bank_size + 1))
+    select_time, grade_time = simulate(ReviewScheduler(item_ids, seed=seed), reviews, random.Random(seed))
+
+    # Measure memory in a separate pass; tracing allocations would skew the timings
+    tracemalloc.start()
+    scheduler = ReviewScheduler(item_ids, seed=seed)
+    simulate(scheduler, reviews, random.Random(seed))
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return select_time / reviews * 1e6, grade_time / reviews * 1e6, held / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--reviews", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    print(f"{'bank size':>10} {'select µs':>10} {'grade µs':>10} {'KiB/learner':>12}")
+    for size in args.sizes:
+        select_us, grade_us, kib = run(size, args.reviews)
+        print(f"{size:>10} {select_us:>10.2f} {grade_us:>10.2f} {kib:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Memory held per session by the practice state, before and after compacting it.
+
+Builds many sessions' worth of state in three layouts and reports the bytes
+each session adds, measured with ``tracemalloc``:
+
+* ``original``: the first app's layout. A ``User`` with a plain
+  ``__dict__``, the current word/sentence/dialogue as item dicts rebuilt on
+  every rerun (so each session holds its own copies), a ``grammar_progress``
+  dict and a session-state key per counter.
+* ``keys``: integer item ids into the shared ``ContentStore`` and a slotted
+  ``User``, but still a key per counter and a grammar progress dict.
+* ``compact``: a slotted ``User`` and one ``PracticeState``.
+
+Every session has visited all four levels; schedulers are left out because
+they are the same in the last two layouts (see ``bench_scheduler``). Run
+from the repository root::
+
+    python -m benchmarks.bench_session
+    python -m benchmarks.bench_session --sessions 1000 10000
+"""
+import argparse
+import json
+import random
+import tracemalloc
+
+from content_store import ContentStore
+from practice_state import PracticeState
+from progress_store import User
+
+
+class DictUser:
+    """The original inline ``User``: same fields, no ``__slots__``."""
+
+    def __init__(self):
+        self.xp = 0
+        self.level = 1
+        self.streak = 0
+
+
+def rebuilt(value):
+    """A private copy of shared content, as a rerun that rebuilt the item lists would hold."""
+    return json.loads(json.dumps(value, default=dict))
+
+
+def original_session(store, rng, categories):
+    items = {level: rebuilt(store.get(rng.choice(store.ids(level)))) for level in (2, 3, 4)}
+    return {
+        "user": DictUser(),
+        "canvas_key": rng.randrange(50),
+        "letter_input_key": rng.randrange(50),
+        "current_word": items[2],
+        "current_sentence": items[3],
+        "grammar_progress": {cat: rng.randrange(10) for cat in rebuilt(categories)},
+        "current_dialogue": items[4],
+        "conversation_step": rng.randrange(2),
+        "conversation_streak": rng.randrange(20),
+    }
+
+
+def keys_session(store, rng, categories):
+    return {
+        "user": User(f"learner-{rng.getrandbits(64):016x}"),
+        "canvas_key": rng.randrange(50),
+        "letter_input_key": rng.randrange(50),
+        "current_word_id": rng.choice(store.ids(2)),
+        "current_sentence_id": rng.choice(store.ids(3)),
+        "grammar_progress": {cat: rng.randrange(10) for cat in categories},
+        "current_dialogue_id": rng.choice(store.ids(4)),
+        "conversation_step": rng.randrange(2),
+        "conversation_streak": rng.randrange(20),
+    }
+
+
+def compact_session(store, rng, categories):
+    practice = PracticeState()
+    practice.canvas_key = rng.randrange(50)
+    practice.letter_input_key = rng.randrange(50)
+    practice.word_id = rng.choice(store.ids(2))
+    practice.sentence_id = rng.choice(store.ids(3))
+    counts = practice.grammar_counts(categories)
+    for i in range(len(counts)):
+        counts[i] = rng.randrange(10)
+    practice.dialogue_id = rng.choice(store.ids(4))
+    practice.conversation_step = rng.randrange(2)
+    practice.conversation_streak = rng.randrange(20)
+    return {"user": User(f"learner-{rng.getrandbits(64):016x}"), "practice": practice}
+
+
+LAYOUTS = {"original": original_session, "keys": keys_session, "compact": compact_session}
+
+
+def bytes_per_session(build, store, sessions, seed=0):
+    rng = random.Random(seed)
+    categories = store.categories(3)
+    for level in (2, 3, 4):
+        store.ids(level)  # Shared across sessions; keep them out of the measurement
+    build(store, random.Random(seed), categories)  # Warm the item cache too
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    # Streamlit keeps one state mapping per session; the outer list stands in for its registry
+    states = [build(store, rng, categories) for _ in range(sessions)]
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del states
+    return held / sessions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="*", default=[1000, 10000])
+    parser.add_argument("--content-db", default=None, help="content database (default: the built-in lessons)")
+    args = parser.parse_args(argv)
+
+    store = ContentStore(args.content_db)
+    print(f"{'sessions':>9}" + "".join(f"{name + ' B':>13}" for name in LAYOUTS) + f"{'saved':>9}")
+    for sessions in args.sessions:
+        sizes = {name: bytes_per_session(build, store, sessions) for name, build in LAYOUTS.items()}
+        saved = 1 - sizes["compact"] / sizes["original"]
+        print(f"{sessions:>9}" + "".join(f"{size:>13.0f}" for size in sizes.values()) + f"{saved:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Check the pronunciation score thresholds against synthetic speakers.
+
+Every text the app scores (letters, words and dialogue lines) is read by a
+reference voice, as the app's own audio would be, and then by other voices
+and speeds standing in for learners. A learner clip scored against its own
+text is a match; the same clip scored against the next text of the same
+kind is a mismatch. The script reports the distance percentiles of both,
+how often each lands above the app's "good" and "close" scores with the
+current ``GOOD_DISTANCE``/``BAD_DISTANCE``, and suggested thresholds. It
+needs a TTS backend that speaks, such as espeak-ng; the stub backend's
+tones are not speech. Run from the repository root::
+
+    python -m benchmarks.calibrate_pronunciation
+    python -m benchmarks.calibrate_pronunciation --voices en-us en+f3 en-gb-scotland --slow
+"""
+import argparse
+
+import numpy as np
+
+from lessons import ALPHABET, DIALOGUES, WORDS
+from pronunciation import BAD_DISTANCE, GOOD_DISTANCE, decode_audio, distance_score, dtw_distance, features
+from tts_backends import get_backend
+
+# Scores the app praises and calls "almost there" (app.SPEAKING_GOOD/SPEAKING_CLOSE)
+GOOD_SCORE = 80
+CLOSE_SCORE = 50
+# Suggested thresholds: three quarters of the matches score 100 and of the mismatches 0
+MATCH_QUANTILE = 0.75
+MISMATCH_QUANTILE = 0.25
+
+
+def text_groups():
+    """Return the texts the app scores, grouped by level so mismatches are of the same kind."""
+    return {
+        "letters": list(ALPHABET),
+        "words": list(WORDS),
+        "dialogue": [d["dialogue"] for d in DIALOGUES],
+    }
+
+
+def distances(backend, texts, voice, reference_voice="en", slow=False):
+    """Return (match, mismatch) distances for ``voice`` reading ``texts``."""
+    references = [features(decode_audio(backend.synthesize(text, reference_voice))) for text in texts]
+    attempts = [features(decode_audio(backend.synthesize(text, voice, slow))) for text in texts]
+    match = [dtw_distance(attempt, reference) for attempt, reference in zip(attempts, references)]
+    mismatch = [dtw_distance(attempt, references[(i + 1) % len(texts)]) for i, attempt in enumerate(attempts)]
+    return match, mismatch
+
+
+def summary(name, values, thresholds):
+    """Print distance percentiles and the share scoring good/close under each ``(good, bad)`` pair."""
+    values = np.asarray(values)
+    finite = values[np.isfinite(values)]
+    p10, p50, p90 = np.percentile(finite, [10, 50, 90]) if len(finite) else (np.inf,) * 3
+    rates = ""
+    for good, bad in thresholds:
+        scores = np.array([distance_score(d, good, bad) for d in values])
+        rates += f" {(scores >= GOOD_SCORE).mean():>7.0%} {(scores >= CLOSE_SCORE).mean():>7.0%}"
+    print(f"{name:>9} {len(values):>5} {p10:>7.2f} {p50:>7.2f} {p90:>7.2f}" + rates)
+
+
+def suggest(match, mismatch):
+    match, mismatch = np.asarray(match), np.asarray(mismatch)
+    return (float(np.quantile(match[np.isfinite(match)], MATCH_QUANTILE)),
+            float(np.quantile(mismatch[np.isfinite(mismatch)], MISMATCH_QUANTILE)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", default="espeak", help="TTS backend reading every voice (default: espeak)")
+    parser.add_argument("--reference-voice", default="en")
+    parser.add_argument("--voices", nargs="*", default=["en-us", "en+f3", "en-gb-scotland"],
+                        help="voices standing in for learners")
+    parser.add_argument("--slow", action="store_true", help="learner voices also speak slowly")
+    args = parser.parse_args(argv)
+
+    backend = get_backend(args.backend)
+    results = {}
+    for group, texts in text_groups().items():
+        match, mismatch = [], []
+        for voice in args.voices:
+            for slow in (False, True) if args.slow else (False,):
+                m, x = distances(backend, texts, voice, args.reference_voice, slow)
+                match += m
+                mismatch += x
+        results[group] = match, mismatch
+
+    good, bad = suggest(sum((m for m, _ in results.values()), []), sum((x for _, x in results.values()), []))
+    thresholds = [(GOOD_DISTANCE, BAD_DISTANCE), (good, bad)]
+    print(f"current:   GOOD_DISTANCE = {GOOD_DISTANCE}, BAD_DISTANCE = {BAD_DISTANCE}")
+    print(f"suggested: GOOD_DISTANCE = {good:.2f}, BAD_DISTANCE = {bad:.2f}")
+    for group, (match, mismatch) in results.items():
+        print(f"\n{group:<9} {'pairs':>5} {'p10':>7} {'p50':>7} {'p90':>7}"
+              f" {'good':>7} {'close':>7} {'good*':>7} {'close*':>7}")
+        summary("match", match, thresholds)
+        summary("mismatch", mismatch, thresholds)
+    print("\ngood/close: share scoring at least 80/50 now; * with the suggested thresholds")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
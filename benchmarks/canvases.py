@@ -0,0 +1,89 @@
+"""Synthetic handwriting canvases rendered from system fonts.
+
+Frames look like what ``st_canvas`` sends for the app's canvases: an RGBA
+array with an opaque white background and black ink. Each frame is the
+text in a random font with a small random rotation, offset and stroke
+weight, so recognition sees some variety without a human drawing anything.
+"""
+import random
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from letter_classifier import find_fonts
+
+LETTER_CANVAS = (800, 400)  # Level 1 canvas, width x height
+WORD_CANVAS = (400, 200)  # Level 2 canvas
+
+
+def load_fonts(limit=12):
+    """Return PIL fonts for up to ``limit`` system fonts, or the built-in bitmap font."""
+    fonts = []
+    for path in find_fonts(limit=limit):
+        try:
+            fonts.append(ImageFont.truetype(path, 100))
+        except OSError:
+            continue
+    return fonts or [ImageFont.load_default()]
+
+
+def render_canvas(text, size=LETTER_CANVAS, font=None, rng=None):
+    """Return an (h, w, 4) uint8 frame with ``text`` drawn across most of the canvas height."""
+    rng = rng or random.Random(0)
+    font = font or load_fonts(1)[0]
+    width, height = size
+    weight = rng.randint(1, 4)
+    probe = ImageDraw.Draw(Image.new("L", (1, 1)))
+    left, top, right, bottom = probe.textbbox((0, 0), text, font=font, stroke_width=weight)
+    glyphs = Image.new("L", (right - left + 8, bottom - top + 8), 0)
+    ImageDraw.Draw(glyphs).text((4 - left, 4 - top), text, fill=255, font=font,
+                                stroke_width=weight, stroke_fill=255)
+    glyphs = glyphs.rotate(rng.uniform(-8, 8), resample=Image.BILINEAR, expand=True)
+
+    # Scale so the text fills 50-80% of the canvas in its tighter dimension
+    fill = rng.uniform(0.5, 0.8)
+    scale = min(width * fill / glyphs.width, height * fill / glyphs.height)
+    glyphs = glyphs.resize((max(1, int(glyphs.width * scale)), max(1, int(glyphs.height * scale))))
+    x = rng.randint(0, width - glyphs.width)
+    y = rng.randint(0, height - glyphs.height)
+
+    ink = np.zeros((height, width), np.uint8)
+    ink[y:y + glyphs.height, x:x + glyphs.width] = np.asarray(glyphs)
+    frame = np.full((height, width, 4), 255, np.uint8)
+    frame[..., :3] = 255 - ink[..., None]
+    return frame
+
+
+def canvas_set(texts, size, count, seed=0):
+    """Return ``count`` ``(text, frame)`` pairs cycling through ``texts`` and the system fonts."""
+    rng = random.Random(seed)
+    fonts = load_fonts()
+    return [
+        (text, render_canvas(text, size, fonts[i % len(fonts)], rng))
+        for i, text in zip(range(count), (texts[i % len(texts)] for i in range(count)))
+    ]
+
+
+def canvas_strokes(frame):
+    """Return ``st_canvas``-style ``json_data`` that redraws the ink of ``frame`` as freehand strokes.
+
+    The ink is thinned to a morphological skeleton and every skeleton pixel
+    becomes a one-point path at the pen width, which the canvas draws as a
+    dot; together they cover the original ink at its original width.
+    """
+    ink = (frame[..., :3].min(axis=2) < 128).astype(np.uint8)
+    kernel = np.ones((3, 3), np.uint8)
+    skeleton = np.zeros_like(ink)
+    distance = cv2.distanceTransform(ink, cv2.DIST_L2, 3)
+    remaining = ink
+    while remaining.any():
+        eroded = cv2.erode(remaining, kernel)
+        skeleton |= remaining & ~cv2.dilate(eroded, kernel)
+        remaining = eroded
+    ys, xs = np.nonzero(skeleton)
+    width = max(1.0, float(np.median(distance[ys, xs])) * 2)
+    return {"objects": [
+        {"type": "path", "strokeWidth": width, "path": [["M", float(x), float(y)]]}
+        for x, y in zip(xs, ys)
+    ]}
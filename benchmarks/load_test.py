@@ -0,0 +1,336 @@
+"""Simulate a classroom of concurrent sessions against one app process.
+
+Each simulated student is a thread with its own ``AppTest`` session. It
+picks levels from the main menu, waits a random think time between
+actions, and submits right or wrong answers. Where levels 1 and 2 show a
+canvas it draws instead: a stand-in for ``streamlit_drawable_canvas``
+returns a synthetic canvas frame rendered from a font (or its strokes with
+``CANVAS_INPUT=strokes``), and the student clicks the Check button, so the
+drawing goes through the app's recognition, XP and analytics like a real
+one.
+
+Reported per session count: reruns per second, p50/p95/p99 latency per
+action, resident memory added per session, and actions skipped because
+the page did not offer them. Sweeping the session count shows where one
+server saturates::
+
+    python -m benchmarks.load_test --sessions 1 5 10 20 40 --duration 30
+    python -m benchmarks.load_test --sessions 25 --think 0.5 --out load.json
+
+``AppTest`` installs a process-global runtime for each script run, so runs
+are serialized on a lock. A Streamlit server runs scripts in threads that
+share one GIL too, so CPU-bound throughput is comparable, and latency
+includes the queueing a saturated server adds. Work that releases the GIL
+(OpenCV, Tesseract) runs outside the lock and overlaps as it does on a
+server. ``AppTest`` also reruns the whole script where the server would
+rerun only a fragment, so ``st.rerun(scope="fragment")`` after a correct
+level 1 answer aborts the run there. Those runs are counted under
+``fragment_reruns`` and left out of the latency percentiles; Streamlit's
+own control-flow exceptions are not counted under ``app_errors``.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import Counter
+
+import numpy as np
+
+import lessons
+from content_store import ContentStore
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+LEVEL_NAMES = list(lessons.LEVELS)
+ANSWER_BOXES = dict(zip(LEVEL_NAMES, ["letter_input_0", "word_input", "sentence_input", "dialogue_input"]))
+# Chance that a submitted answer is right
+CORRECT_RATE = 0.7
+
+_RUN_LOCK = threading.Lock()
+# Exceptions that stop or restart a run rather than report a failure
+CONTROL_FLOW_EXCEPTIONS = {"RerunException", "StopException"}
+# What the fragment-scoped rerun raises under AppTest, which always runs the whole script
+FRAGMENT_RERUN_ERROR = ("streamlit.errors.StreamlitInvalidLayoutContextError", 'scope="fragment" can only be specified')
+CHECK_BUTTONS = ("Check Writing", "Check Word")
+
+
+def rss_bytes():
+    """Return the process's resident set size (peak size where the current one is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def is_fragment_rerun(exception):
+    """True for the error AppTest raises where the server would rerun only a fragment."""
+    kind, message = FRAGMENT_RERUN_ERROR
+    return exception.proto.type == kind and message in exception.proto.message
+
+
+def is_app_error(exception):
+    """True for an exception element that reports a real failure of the app."""
+    return exception.proto.type not in CONTROL_FLOW_EXCEPTIONS and not is_fragment_rerun(exception)
+
+
+class CanvasResult:
+    """What ``st_canvas`` returns; like the real one, ``image_data`` raises unless it was requested."""
+
+    def __init__(self, image_data, json_data, return_image_data):
+        self._image_data = image_data
+        self._return_image_data = return_image_data
+        self.json_data = json_data
+
+    @property
+    def image_data(self):
+        if not self._return_image_data:
+            raise RuntimeError("image_data was not requested. Pass return_image_data=True to st_canvas().")
+        return self._image_data
+
+
+class CanvasStandIn:
+    """Replaces ``st_canvas`` for the session being run with the drawing it has put on the canvas.
+
+    Runs are serialized, so the running session sets ``drawing`` to its
+    ``(canvas key, frame, json_data)`` first. A canvas with another key (the
+    app bumps it to clear the canvas) comes back empty. ``rendered`` is the
+    key of the last canvas the app showed, or None.
+    """
+
+    def __init__(self):
+        self.drawing = None
+        self.rendered = None
+
+    def __call__(self, key=None, return_image_data=False, **kwargs):
+        self.rendered = key
+        frame = json_data = None
+        if self.drawing is not None and self.drawing[0] == key:
+            _, frame, json_data = self.drawing
+        return CanvasResult(frame, json_data, return_image_data)
+
+    def install(self):
+        module = types.ModuleType("streamlit_drawable_canvas")
+        module.st_canvas = self
+        module.CanvasResult = CanvasResult
+        sys.modules[module.__name__] = module
+
+
+CANVAS = CanvasStandIn()
+
+
+class Session(threading.Thread):
+    """One simulated student working through the levels until the deadline."""
+
+    def __init__(self, index, deadline, think, drawings, store, record):
+        super().__init__(name=f"session-{index}", daemon=True)
+        self.rng = random.Random(index)
+        self.deadline = deadline
+        self.think = think
+        self.drawings = drawings
+        self.store = store
+        self.record = record
+        self.error = None
+        self.app_errors = 0
+        self.fragment_reruns = 0
+        self.skipped = Counter()
+        self.drawing = None
+        self.canvas = None
+        self.at = None
+
+    def _run_app(self, action, prepare=None):
+        with _RUN_LOCK:
+            CANVAS.drawing, CANVAS.rendered = self.drawing, None
+            if prepare is not None:
+                prepare()
+            start = time.perf_counter()
+            self.at.run()
+            self.canvas = CANVAS.rendered
+        seconds = time.perf_counter() - start
+        if any(map(is_fragment_rerun, self.at.exception)):
+            self.fragment_reruns += 1  # Aborted halfway, so its time is not a rerun's latency
+        else:
+            self.record(action, seconds)
+        self.app_errors += any(map(is_app_error, self.at.exception))
+
+    def _answer(self, level, correct):
+        state = self.at.session_state
+        if level == LEVEL_NAMES[0]:
+            letter = self.at.selectbox(key="letter_select").value
+            return letter if correct else "?"
+        attr = {LEVEL_NAMES[1]: "word_id", LEVEL_NAMES[2]: "sentence_id", LEVEL_NAMES[3]: "dialogue_id"}[level]
+        item_id = getattr(state["practice"], attr) if "practice" in state else None
+        item = self.store.get(item_id) if item_id is not None else None
+        if item is None or not correct:
+            return f"wrong answer {self.rng.random():.6f}"
+        if "word" in item:
+            return item["word"]
+        if "answer" in item:
+            return item["answer"]
+        return self.rng.choice(item["responses"])
+
+    def _submit(self, level):
+        box = ANSWER_BOXES[level]
+        if not any(widget.key == box for widget in self.at.text_input):
+            # Form key changed after a correct level 1 answer; pick up the new one
+            boxes = [widget.key for widget in self.at.text_input if widget.key and widget.key.startswith("letter_input_")]
+            if not boxes:
+                self.skipped["answer"] += 1
+                return
+            box = boxes[0]
+        correct = self.rng.random() < CORRECT_RATE
+        answer = self._answer(level, correct)
+
+        def prepare():
+            self.at.text_input(key=box).input(answer)
+            self.at.button[0].click()
+        self._run_app("answer_correct" if correct else "answer_wrong", prepare)
+
+    def _draw(self, level):
+        """Put a synthetic drawing on the canvas (one rerun), then click Check (another)."""
+        kind = "letters" if level == LEVEL_NAMES[0] else "words"
+        expected = self._answer(level, True).lower()
+        correct = expected in self.drawings[kind] and self.rng.random() < CORRECT_RATE
+        text = expected if correct else self.rng.choice([t for t in self.drawings[kind] if t != expected])
+        drawing = self.rng.choice(self.drawings[kind][text])
+        # A run aborted by the fragment rerun leaves a stale canvas key; draw again on the fresh canvas
+        for _ in range(2):
+            self.drawing = (self.canvas, *drawing)
+            self._run_app("draw")
+            if self.canvas == self.drawing[0]:
+                break
+
+        check = [button for button in self.at.button if button.label in CHECK_BUTTONS]
+        if not check:
+            self.skipped["check_drawing"] += 1
+            return
+        self._run_app("check_correct" if correct else "check_wrong", check[0].click)
+
+    def run(self):
+        from streamlit.testing.v1 import AppTest
+
+        try:
+            self.at = AppTest.from_file(APP_PATH, default_timeout=120)
+            self.at.query_params["learner"] = self.name
+            self._run_app("open")
+            level = None
+            while time.perf_counter() < self.deadline:
+                if level is None or self.rng.random() < 0.1:
+                    level = self.rng.choice(LEVEL_NAMES)
+                    self._run_app("select_level", lambda: self.at.selectbox(key="main_level_select").select(level))
+                elif level in LEVEL_NAMES[:2] and self.canvas is not None:
+                    self._draw(level)
+                else:
+                    self._submit(level)
+                if self.think:
+                    time.sleep(self.rng.expovariate(1 / self.think))
+        except Exception as e:
+            self.error = e
+
+
+def run_load(sessions, duration, think, drawings):
+    """Run ``sessions`` students for ``duration`` seconds; returns a result dict."""
+    samples = {}
+    samples_lock = threading.Lock()
+
+    def record(action, seconds):
+        with samples_lock:
+            samples.setdefault(action, []).append(seconds)
+
+    store = ContentStore()
+    gc.collect()
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    deadline = start + duration
+    threads = [Session(i, deadline, think, drawings, store, record) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    rss_after = rss_bytes()
+
+    actions = {}
+    for action, values in sorted(samples.items()):
+        ms = np.asarray(values) * 1000
+        actions[action] = {
+            "n": int(ms.size),
+            "p50_ms": round(float(np.percentile(ms, 50)), 3),
+            "p95_ms": round(float(np.percentile(ms, 95)), 3),
+            "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        }
+    every = np.concatenate([np.asarray(v) for v in samples.values()]) * 1000 if samples else np.zeros(1)
+    errors = [f"{t.name}: {type(t.error).__name__}: {t.error}" for t in threads if t.error]
+    return {
+        "sessions": sessions,
+        "seconds": round(elapsed, 2),
+        "reruns_per_sec": round(sum(map(len, samples.values())) / elapsed, 2),
+        "p50_ms": round(float(np.percentile(every, 50)), 3),
+        "p95_ms": round(float(np.percentile(every, 95)), 3),
+        "p99_ms": round(float(np.percentile(every, 99)), 3),
+        "rss_mb": round(rss_after / 2**20, 1),
+        "rss_per_session_kb": round((rss_after - rss_before) / sessions / 1024, 1),
+        "app_errors": sum(t.app_errors for t in threads),
+        "fragment_reruns": sum(t.fragment_reruns for t in threads),
+        "skipped": dict(sum((t.skipped for t in threads), Counter())),
+        "actions": actions,
+        "errors": errors,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="*", default=[1, 5, 10, 20])
+    parser.add_argument("--duration", type=float, default=20, help="seconds per session count")
+    parser.add_argument("--think", type=float, default=1.0, help="mean seconds between a student's actions")
+    parser.add_argument("--drawings", type=int, default=40, help="distinct synthetic canvases to draw from")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    # Keep the app off the network and away from the real caches, progress database and class log
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+    os.environ["TTS_BACKEND"] = "stub"
+    os.environ["TTS_CACHE_DIR"] = os.path.join(workdir, "tts")
+    os.environ["PROGRESS_DB"] = os.path.join(workdir, "progress.db")
+    os.environ["ANALYTICS_LOG"] = os.path.join(workdir, "class_events.jsonl")
+
+    import handwriting
+    from benchmarks.canvases import LETTER_CANVAS, WORD_CANVAS, canvas_set, canvas_strokes
+
+    strokes = handwriting.canvas_input_mode() == "strokes"
+    drawings = {"letters": {}, "words": {}}
+    for kind, texts, size in (("letters", lessons.ALPHABET, LETTER_CANVAS), ("words", lessons.WORDS, WORD_CANVAS)):
+        for text, frame in canvas_set(list(texts), size, args.drawings):
+            json_data = canvas_strokes(frame) if strokes and kind == "letters" else None
+            drawings[kind].setdefault(text.lower(), []).append((frame, json_data))
+    CANVAS.install()
+    # One short session first, so imports and caches don't count against the first session count
+    run_load(1, min(args.duration, 5), 0, drawings)
+    results = []
+    print(f"{'sessions':>8} {'reruns/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'KiB/session':>12}")
+    for sessions in args.sessions:
+        result = run_load(sessions, args.duration, args.think, drawings)
+        results.append(result)
+        print(f"{sessions:>8} {result['reruns_per_sec']:>9.1f} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+              f"{result['p99_ms']:>8.1f} {result['rss_per_session_kb']:>12.1f}")
+        if result["skipped"] or result["app_errors"]:
+            print(f"  skipped {result['skipped']}, {result['app_errors']} app errors", file=sys.stderr)
+        for error in result["errors"]:
+            print(f"  {error}", file=sys.stderr)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"think_seconds": args.think, "duration_seconds": args.duration, "runs": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
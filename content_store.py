@@ -0,0 +1,172 @@
+"""Indexed, read-only lesson content store backed by SQLite.
+
+Every lesson item (letter, word, sentence or dialogue) is one row with its
+level, grammar category, difficulty and a JSON payload. Rows are indexed by
+level, category and difficulty so picking or paging through items stays
+cheap as the bank grows to tens of thousands of entries. The store is opened
+once per server process and shared read-only by every session; items are
+returned as read-only mappings so no session gets its own copy.
+
+Without a database file the store is built in memory from ``lessons.py``.
+To build a file, optionally adding more items from a JSON Lines file with
+``level``, ``category``, ``difficulty`` and the item fields::
+
+    python content_store.py build --out lessons.db --extra more_items.jsonl
+"""
+import argparse
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import threading
+from functools import lru_cache
+from types import MappingProxyType
+
+import lessons
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lessons.db")
+SCHEMA = """
+CREATE TABLE items (
+    id INTEGER PRIMARY KEY,
+    level INTEGER NOT NULL,
+    category TEXT,
+    difficulty INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+"""
+INDEXES = """
+CREATE INDEX idx_items_level ON items (level, id);
+CREATE INDEX idx_items_level_category ON items (level, category, id);
+CREATE INDEX idx_items_level_difficulty ON items (level, difficulty, id);
+"""
+
+
+def _difficulty(level, item):
+    """Use the item's own difficulty, or estimate one from its length (1 = easiest)."""
+    if "difficulty" in item:
+        return int(item["difficulty"])
+    if level == 2:
+        return 1 if len(item["word"]) <= 4 else 2 if len(item["word"]) <= 6 else 3
+    if level == 3:
+        return 1 if " " not in item["answer"] else 2
+    if level == 4:
+        return 1 if min(len(r.split()) for r in item["responses"]) <= 3 else 2
+    return 1
+
+
+def seed_items():
+    """Yield ``(level, category, difficulty, item)`` for the built-in lessons."""
+    for letter in lessons.ALPHABET:
+        yield 1, None, 1, {"letter": letter}
+    for word, meaning in lessons.WORDS.items():
+        item = {"word": word, "meaning": meaning}
+        yield 2, None, _difficulty(2, item), item
+    for item in lessons.SENTENCES:
+        yield 3, item["category"], _difficulty(3, item), item
+    for item in lessons.DIALOGUES:
+        yield 4, item.get("category"), _difficulty(4, item), item
+
+
+def read_jsonl(path):
+    """Yield ``(level, category, difficulty, item)`` rows from a JSON Lines file."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                level = int(item.pop("level"))
+                yield level, item.get("category"), _difficulty(level, item), item
+
+
+def build_store(conn, rows):
+    """Create the schema in ``conn``, bulk insert ``rows`` and build the indexes."""
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO items (level, category, difficulty, payload) VALUES (?, ?, ?, ?)",
+        ((level, category, difficulty, json.dumps(item, ensure_ascii=False))
+         for level, category, difficulty, item in rows),
+    )
+    # Indexing after the bulk insert is much faster than maintaining them row by row
+    conn.executescript(INDEXES)
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+class ContentStore:
+    """Read-only view of the lesson items, safe to share across sessions."""
+
+    def __init__(self, path=None):
+        if path and os.path.exists(path):
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+            build_store(self._conn, seed_items())
+        self._lock = threading.Lock()
+        self.get = lru_cache(maxsize=4096)(self._get)
+        self.ids = lru_cache(maxsize=256)(self._ids)
+        self.categories = lru_cache(maxsize=16)(self._categories)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _get(self, item_id):
+        """Return the item with ``item_id`` as a read-only mapping, or None."""
+        rows = self._query("SELECT payload FROM items WHERE id = ?", (item_id,))
+        if not rows:
+            return None
+        return MappingProxyType(json.loads(rows[0][0]))
+
+    def _ids(self, level, category=None, difficulty=None):
+        """Return the ids of every item in ``level``, optionally filtered."""
+        sql, params = "SELECT id FROM items WHERE level = ?", [level]
+        if category is not None:
+            sql += " AND category = ?"
+            params.append(category)
+        if difficulty is not None:
+            sql += " AND difficulty = ?"
+            params.append(difficulty)
+        return tuple(row[0] for row in self._query(sql + " ORDER BY id", params))
+
+    def page(self, level, after_id=0, limit=50, category=None):
+        """Return up to ``limit`` ``(id, item)`` pairs with ids greater than ``after_id``."""
+        sql, params = "SELECT id FROM items WHERE level = ? AND id > ?", [level, after_id]
+        if category is not None:
+            sql += " AND category = ?"
+            params.append(category)
+        rows = self._query(sql + " ORDER BY id LIMIT ?", params + [limit])
+        return [(row[0], self.get(row[0])) for row in rows]
+
+    def _categories(self, level):
+        """Return the distinct categories used in ``level``, in first-seen order."""
+        rows = self._query(
+            "SELECT category FROM items WHERE level = ? AND category IS NOT NULL "
+            "GROUP BY category ORDER BY MIN(id)", (level,)
+        )
+        return tuple(row[0] for row in rows)
+
+    def count(self, level):
+        return self._query("SELECT COUNT(*) FROM items WHERE level = ?", (level,))[0][0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the lesson content database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_cmd = commands.add_parser("build", help="write the built-in lessons (and extra items) to a database")
+    build_cmd.add_argument("--out", default=DEFAULT_DB_PATH)
+    build_cmd.add_argument("--extra", nargs="*", default=[], help="JSON Lines files with more items")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.out):
+        os.unlink(args.out)
+    rows = itertools.chain(seed_items(), *(read_jsonl(path) for path in args.extra))
+    conn = sqlite3.connect(args.out)
+    build_store(conn, rows)
+    count = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    conn.close()
+    print(f"Wrote {count} items to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""Grading rules for typed answers, and a bulk grader for classroom CSVs.
+
+``grade`` is the check the app runs when a learner submits a sentence
+(level 3) or dialogue reply (level 4), so the interactive and batch paths
+award the same XP and streaks.
+
+The batch grader streams a submissions CSV with ``student_id``, ``answer``
+and either ``item_id`` (from the content store) or ``prompt`` (the sentence
+or dialogue line as shown), grading rows in chunks on a process pool::
+
+    python grading.py submissions.csv --out-dir results --workers 8
+
+Rows are read and applied in file order, so each student's XP, level and
+streak come out as if they had answered in the app one row at a time. Only
+answer matching runs in the workers; at most ``2 * workers`` chunks are in
+flight, so memory stays bounded by the chunk size and the number of
+students, not the file length. Results are written to ``students.csv``
+(answered, correct, xp, level, streak) and ``categories.csv`` (answered,
+correct and accuracy per grammar category).
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import NamedTuple
+
+from content_store import ContentStore, DEFAULT_DB_PATH
+from progress_store import User
+
+SENTENCE_XP = 5
+DIALOGUE_XP = 5
+CREATIVE_XP = 2  # A near-miss dialogue reply still earns a little
+DIALOGUE_CATEGORY = "Conversations"  # Dialogues have no grammar category of their own
+CHUNK_ROWS = 5000
+# Worker result code for a row whose item is not a sentence or dialogue
+UNKNOWN_ITEM = 255
+
+
+class Grade(NamedTuple):
+    correct: bool
+    close: bool  # Wrong, but near enough to an accepted answer for encouragement
+    xp: int
+
+
+def grade(item, match, answer):
+    """Grade ``answer`` to a sentence or dialogue ``item`` given its ``AnswerMatcher`` match.
+
+    Sentences need an exact answer (ignoring case and punctuation); dialogue
+    replies are accepted when they are close to any suggested response, and
+    a near miss earns ``CREATIVE_XP``. An empty answer is wrong.
+    """
+    if not answer:
+        return Grade(False, False, 0)
+    if "responses" in item:
+        if match.accepted:
+            return Grade(True, False, DIALOGUE_XP)
+        return Grade(False, match.close, CREATIVE_XP if match.close else 0)
+    if match.exact:
+        return Grade(True, False, SENTENCE_XP)
+    return Grade(False, match.close, 0)
+
+
+def category(item):
+    return item.get("category") or (DIALOGUE_CATEGORY if "responses" in item else None)
+
+
+# Worker side: only answer matching, against a per-process matcher cache
+
+_store = None
+
+
+def _init_worker(content_path):
+    global _store
+    _store = ContentStore(content_path)
+
+
+@lru_cache(maxsize=4096)
+def _matcher(item_id):
+    from answer_matching import AnswerMatcher
+
+    item = _store.get(item_id)
+    if item is None or not ("responses" in item or "answer" in item):
+        return None, None
+    return item, AnswerMatcher(item["responses"] if "responses" in item else [item["answer"]])
+
+
+def _grade_chunk(item_ids, answers):
+    """Return one byte per row: ``xp << 2 | correct << 1 | close``, or ``UNKNOWN_ITEM``."""
+    codes = bytearray(len(answers))
+    for i, (item_id, answer) in enumerate(zip(item_ids, answers)):
+        item, matcher = _matcher(item_id)
+        if matcher is None:
+            codes[i] = UNKNOWN_ITEM
+            continue
+        result = grade(item, matcher.match(answer), answer)
+        codes[i] = result.xp << 2 | result.correct << 1 | result.close
+    return bytes(codes)
+
+
+# Parent side: stream the file, keep per-student and per-category totals
+
+class _Student:
+    __slots__ = ("user", "answered", "correct")
+
+    def __init__(self, student_id):
+        self.user = User(student_id)
+        self.answered = 0
+        self.correct = 0
+
+
+class BatchGrader:
+    """Streams submissions through a process pool and accumulates the results in order."""
+
+    def __init__(self, content_path=None, workers=None, chunk_rows=CHUNK_ROWS):
+        self.content_path = content_path
+        self.workers = os.cpu_count() if workers is None else workers
+        self.chunk_rows = chunk_rows
+        self.store = ContentStore(content_path)
+        self.students = {}
+        self.categories = {}
+        self.rows = 0
+        self.unknown = 0
+        self._prompts = None
+        self._category = lru_cache(maxsize=4096)(lambda item_id: category(self.store.get(item_id)))
+
+    def _prompt_ids(self):
+        """Map every sentence and dialogue line, as shown in the app, to its item id."""
+        if self._prompts is None:
+            self._prompts = {}
+            for level in (3, 4):
+                after = 0
+                while True:
+                    page = self.store.page(level, after, limit=500)
+                    if not page:
+                        break
+                    for item_id, item in page:
+                        for key in ("sentence", "dialogue", "follow_up"):
+                            if key in item:
+                                self._prompts.setdefault(item[key].strip(), item_id)
+                    after = page[-1][0]
+        return self._prompts
+
+    def _chunks(self, reader):
+        """Yield ``(students, item_ids, answers)`` lists of up to ``chunk_rows`` CSV rows."""
+        header = next(reader)
+        try:
+            student_col, answer_col = header.index("student_id"), header.index("answer")
+        except ValueError:
+            raise ValueError("submissions need student_id and answer columns") from None
+        item_col = header.index("item_id") if "item_id" in header else None
+        prompt_col = header.index("prompt") if "prompt" in header else None
+        if item_col is None and prompt_col is None:
+            raise ValueError("submissions need an item_id or prompt column")
+        width = len(header)
+
+        students, item_ids, answers = [], [], []
+        for row in reader:
+            if len(row) < width:
+                row += [""] * (width - len(row))
+            item_id = row[item_col] if item_col is not None else ""
+            if item_id:
+                try:
+                    item_id = int(item_id)
+                except ValueError:
+                    item_id = -1  # Graded as an unknown item, like a missing one
+            else:
+                item_id = self._prompt_ids().get(row[prompt_col].strip(), -1) if prompt_col is not None else -1
+            students.append(row[student_col])
+            item_ids.append(item_id)
+            answers.append(row[answer_col])
+            if len(answers) == self.chunk_rows:
+                yield students, item_ids, answers
+                students, item_ids, answers = [], [], []
+        if answers:
+            yield students, item_ids, answers
+
+    def _apply(self, students, item_ids, codes):
+        for student_id, item_id, code in zip(students, item_ids, codes):
+            if code == UNKNOWN_ITEM:
+                self.unknown += 1
+                continue
+            student = self.students.get(student_id)
+            if student is None:
+                student = self.students[student_id] = _Student(student_id)
+            correct = code >> 1 & 1
+            student.answered += 1
+            student.correct += correct
+            if code >> 2:
+                student.user.earn_xp(code >> 2)
+            student.user.maintain_streak(correct)
+            name = self._category(item_id)
+            totals = self.categories.get(name)
+            if totals is None:
+                totals = self.categories[name] = [0, 0]
+            totals[0] += 1
+            totals[1] += correct
+            self.rows += 1
+
+    def grade_csv(self, f):
+        """Grade every row of an open submissions CSV; results accumulate on this grader."""
+        reader = csv.reader(f)
+        if self.workers <= 1:
+            _init_worker(self.content_path)
+            for students, item_ids, answers in self._chunks(reader):
+                self._apply(students, item_ids, _grade_chunk(item_ids, answers))
+            return
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.content_path,)) as pool:
+            in_flight = deque()
+            for students, item_ids, answers in self._chunks(reader):
+                in_flight.append((students, item_ids, pool.submit(_grade_chunk, item_ids, answers)))
+                if len(in_flight) >= 2 * self.workers:
+                    students, item_ids, future = in_flight.popleft()
+                    self._apply(students, item_ids, future.result())
+            while in_flight:
+                students, item_ids, future = in_flight.popleft()
+                self._apply(students, item_ids, future.result())
+
+    def write(self, out_dir):
+        os.makedirs(out_dir, exist_ok=True)
+        with open(os.path.join(out_dir, "students.csv"), "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["student_id", "answered", "correct", "xp", "level", "streak"])
+            for student_id, s in sorted(self.students.items()):
+                writer.writerow([student_id, s.answered, s.correct, s.user.xp, s.user.level, s.user.streak])
+        with open(os.path.join(out_dir, "categories.csv"), "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["category", "answered", "correct", "accuracy"])
+            for name, (answered, correct) in sorted(self.categories.items(), key=lambda kv: str(kv[0])):
+                writer.writerow([name, answered, correct, f"{correct / answered:.4f}"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade a CSV of typed sentence and dialogue answers.")
+    parser.add_argument("submissions", help="CSV with student_id, answer and item_id or prompt columns")
+    parser.add_argument("--out-dir", default="grading_results")
+    parser.add_argument("--workers", type=int, default=None, help="grading processes (default: all cores)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--content-db", default=os.environ.get("CONTENT_DB", DEFAULT_DB_PATH))
+    args = parser.parse_args(argv)
+
+    grader = BatchGrader(args.content_db, args.workers, args.chunk_rows)
+    start = time.perf_counter()
+    with open(args.submissions, newline="", encoding="utf-8") as f:
+        grader.grade_csv(f)
+    seconds = time.perf_counter() - start
+    grader.write(args.out_dir)
+    print(f"Graded {grader.rows} rows for {len(grader.students)} students in {seconds:.1f}s "
+          f"({grader.rows / max(seconds, 1e-9):,.0f} rows/s, {grader.workers} workers); "
+          f"{grader.unknown} rows with unknown items skipped. Results in {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
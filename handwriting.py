@@ -0,0 +1,404 @@
+"""Image preprocessing for handwriting recognition.
+
+Two preprocessing modes turn a canvas frame into the 100x100 image given to
+the OCR engine:
+
+* ``full`` - the original pipeline: upscale the whole canvas 4x, denoise,
+  threshold and dilate it, then crop to the largest contour.
+* ``crop`` - find the ink bounding box on the original-resolution frame
+  first and run the expensive steps only on that region, scaled so the
+  glyph is about ``CROP_TARGET_SIZE`` pixels instead of 4x the canvas.
+
+The mode is chosen with the ``OCR_PREPROCESS`` environment variable;
+``compare`` runs both so their output and timings can be checked side by side.
+
+``rasterize_strokes`` is an alternative to both: with ``CANVAS_INPUT=strokes``
+the canvas's vector paths (``json_data``) are drawn straight into a small,
+tightly cropped binary image, skipping the bitmap conversions entirely.
+
+Words are handled by ``preprocess_word`` and ``segment_glyphs``, which split
+the ink into ordered connected components so every letter can be
+recognized in one batch.
+
+``RecognitionCache`` memoizes recognition results by a hash of the ink
+pixels, so the same drawing is never run through OCR twice.
+
+Every preprocessing function takes an optional ``timings`` dict; when given,
+the seconds spent in each stage (``crop``, ``resize``, ``denoise``,
+``threshold``, ``morphology``, ``contour``) are added to it.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+PREPROCESS_MODES = ("crop", "full")
+DEFAULT_PREPROCESS_MODE = "crop"
+OCR_INPUT_SIZE = (100, 100)
+FULL_SCALE_FACTOR = 4
+CROP_TARGET_SIZE = 320
+CROP_MARGIN = 8
+# Bump whenever preprocessing changes in a way that can change OCR output
+PIPELINE_VERSION = 3
+CANVAS_INPUT_MODES = ("bitmap", "strokes")
+STROKE_MARGIN = 14
+CURVE_STEPS = 4
+WORD_HEIGHT = 64
+WORD_MARGIN = 10
+GLYPH_MIN_AREA = 12
+
+
+@contextmanager
+def timed_stage(timings, name):
+    """Add the time spent in the block to ``timings[name]``, if timings are being collected."""
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def preprocess_mode():
+    """Return the configured preprocessing mode (``crop``, ``full`` or ``compare``)."""
+    mode = os.environ.get("OCR_PREPROCESS", DEFAULT_PREPROCESS_MODE)
+    if mode not in PREPROCESS_MODES + ("compare",):
+        raise ValueError(f"Unknown OCR_PREPROCESS mode {mode!r}")
+    return mode
+
+
+def canvas_input_mode():
+    """Return whether recognition reads the canvas ``bitmap`` or its ``strokes``."""
+    mode = os.environ.get("CANVAS_INPUT", "bitmap")
+    if mode not in CANVAS_INPUT_MODES:
+        raise ValueError(f"Unknown CANVAS_INPUT mode {mode!r}")
+    return mode
+
+
+def to_grayscale(image_data):
+    """Convert an RGB(A) canvas frame to a uint8 grayscale array."""
+    image = image_data.astype(np.uint8)
+    if image.ndim == 2:
+        return image
+    code = cv2.COLOR_RGBA2GRAY if image.shape[2] == 4 else cv2.COLOR_RGB2GRAY
+    return cv2.cvtColor(image, code)
+
+
+def ink_mask(image_data):
+    """Return a boolean mask of drawn pixels.
+
+    Uses the alpha channel when the canvas has a transparent background and
+    falls back to a fixed threshold on the grayscale image otherwise.
+    """
+    image = image_data.astype(np.uint8)
+    if image.ndim == 3 and image.shape[2] == 4:
+        alpha = image[:, :, 3]
+        if alpha.min() < 255:
+            return alpha > 0
+    return to_grayscale(image) < 128
+
+
+def ink_bbox(mask):
+    """Return ``(x, y, w, h)`` of the ink in ``mask``, or None if it is empty."""
+    rows = np.flatnonzero(mask.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1] - cols[0] + 1), int(rows[-1] - rows[0] + 1)
+
+
+def _enhance(gray, scale, timings=None):
+    """Upscale, denoise, threshold and thicken strokes; returns white ink on black."""
+    with timed_stage(timings, "resize"):
+        resized = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    with timed_stage(timings, "denoise"):
+        denoised = cv2.fastNlMeansDenoising(resized, h=15)
+
+    # Keep neighbourhoods the same size relative to the strokes as at 4x
+    relative = scale / FULL_SCALE_FACTOR
+    block_size = max(11, int(31 * relative) | 1)
+    with timed_stage(timings, "threshold"):
+        thresh = cv2.adaptiveThreshold(
+            denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, block_size, 6
+        )
+    k = max(3, int(5 * relative) | 1)
+    kernel = np.ones((k, k), np.uint8)
+    with timed_stage(timings, "morphology"):
+        dilated = cv2.dilate(thresh, kernel, iterations=3)
+        return cv2.erode(dilated, kernel, iterations=1)
+
+
+def _crop_largest(binary, padding, timings=None):
+    """Crop ``binary`` to its largest contour and resize it for OCR."""
+    with timed_stage(timings, "contour"):
+        contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return None
+        x, y, w, h = cv2.boundingRect(max(contours, key=cv2.contourArea))
+        x = max(0, x - padding)
+        y = max(0, y - padding)
+        w = min(binary.shape[1] - x, w + 2 * padding)
+        h = min(binary.shape[0] - y, h + 2 * padding)
+        cropped = binary[y:y+h, x:x+w]
+        return cv2.resize(cropped, OCR_INPUT_SIZE, interpolation=cv2.INTER_CUBIC)
+
+
+def preprocess_full(image_data, timings=None):
+    """Original pipeline over the whole 4x-upscaled canvas."""
+    with timed_stage(timings, "crop"):
+        gray = to_grayscale(image_data)
+    enhanced = _enhance(gray, FULL_SCALE_FACTOR, timings)
+    return _crop_largest(enhanced, 20, timings)
+
+
+def preprocess_crop(image_data, timings=None):
+    """Crop to the ink first, then run the expensive steps on that region only."""
+    with timed_stage(timings, "crop"):
+        mask = ink_mask(image_data)
+        bbox = ink_bbox(mask)
+        if bbox is None:
+            return None
+        x, y, w, h = bbox
+        x0 = max(0, x - CROP_MARGIN)
+        y0 = max(0, y - CROP_MARGIN)
+        x1 = min(mask.shape[1], x + w + CROP_MARGIN)
+        y1 = min(mask.shape[0], y + h + CROP_MARGIN)
+
+        # Paint non-ink pixels white so a transparent background does not read as black
+        gray = to_grayscale(image_data)[y0:y1, x0:x1]
+        gray = np.where(mask[y0:y1, x0:x1], gray, 255).astype(np.uint8)
+
+    scale = min(FULL_SCALE_FACTOR, CROP_TARGET_SIZE / max(gray.shape))
+    enhanced = _enhance(gray, scale, timings)
+    return _crop_largest(enhanced, max(2, int(20 * scale / FULL_SCALE_FACTOR)), timings)
+
+
+PREPROCESSORS = {
+    "crop": preprocess_crop,
+    "full": preprocess_full,
+}
+
+
+def preprocess(image_data, mode=None, timings=None):
+    """Run the preprocessing pipeline selected by ``mode`` (default: configured mode)."""
+    mode = mode or preprocess_mode()
+    if mode == "compare":
+        mode = DEFAULT_PREPROCESS_MODE
+    return PREPROCESSORS[mode](image_data, timings)
+
+
+def compare_modes(image_data):
+    """Run every preprocessing mode and return ``{mode: (seconds, image)}``."""
+    results = {}
+    for mode, func in PREPROCESSORS.items():
+        start = time.perf_counter()
+        image = func(image_data)
+        results[mode] = (time.perf_counter() - start, image)
+    return results
+
+
+def letter_glyph(image_data, timings=None):
+    """Return the drawn ink cropped to its bounding box, white on black, for the letter classifier.
+
+    Unlike ``preprocess`` the strokes are not thickened and the crop keeps
+    its aspect ratio, which is what the classifier was trained on. Returns
+    None if nothing has been drawn.
+    """
+    with timed_stage(timings, "glyph"):
+        mask = ink_mask(image_data)
+        bbox = ink_bbox(mask)
+        if bbox is None:
+            return None
+        x, y, w, h = bbox
+        return mask[y:y+h, x:x+w].astype(np.uint8) * 255
+
+
+def preprocess_word(image_data, timings=None):
+    """Return a binary image of a handwritten word, white ink on black, about 64px tall.
+
+    Only the ink bounding box is processed; the canvas background never
+    reaches the expensive steps. Returns None if nothing has been drawn.
+    """
+    with timed_stage(timings, "crop"):
+        mask = ink_mask(image_data)
+        bbox = ink_bbox(mask)
+        if bbox is None:
+            return None
+        x, y, w, h = bbox
+        binary = mask[y:y+h, x:x+w].astype(np.uint8) * 255
+    scale = min(4.0, max(0.25, WORD_HEIGHT / h))
+    with timed_stage(timings, "resize"):
+        binary = cv2.resize(binary, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    # No dilation: at this height it joins neighbouring letters, and the classifier expects bare strokes
+    with timed_stage(timings, "threshold"):
+        _, binary = cv2.threshold(binary, 127, 255, cv2.THRESH_BINARY)
+        return cv2.copyMakeBorder(binary, WORD_MARGIN, WORD_MARGIN, WORD_MARGIN, WORD_MARGIN,
+                                  cv2.BORDER_CONSTANT, value=0)
+
+
+def segment_glyphs(binary, min_area=GLYPH_MIN_AREA):
+    """Split a word image into glyphs ordered left to right.
+
+    Connected components smaller than ``min_area`` are dropped as noise, and
+    components that overlap horizontally (the dot of an ``i`` or ``j``) are
+    merged with the letter below them. Returns ``(glyphs, boxes)``.
+    """
+    count, _, stats, _ = cv2.connectedComponentsWithStats((binary > 0).astype(np.uint8), connectivity=8)
+    boxes = sorted(
+        [list(stats[i, :4]) for i in range(1, count) if stats[i, cv2.CC_STAT_AREA] >= min_area],
+        key=lambda box: box[0],
+    )
+    merged = []
+    for x, y, w, h in boxes:
+        if merged:
+            px, py, pw, ph = merged[-1]
+            overlap = min(px + pw, x + w) - max(px, x)
+            if overlap >= 0.5 * min(pw, w):
+                nx, ny = min(px, x), min(py, y)
+                merged[-1] = [nx, ny, max(px + pw, x + w) - nx, max(py + ph, y + h) - ny]
+                continue
+        merged.append([x, y, w, h])
+    glyphs = [binary[y:y+h, x:x+w] for x, y, w, h in merged]
+    return glyphs, [tuple(int(v) for v in box) for box in merged]
+
+
+def _path_points(path):
+    """Flatten fabric.js path commands (M/L/Q/C) into an (N, 2) array of points."""
+    points = []
+    current = (0.0, 0.0)
+    t = np.linspace(0, 1, CURVE_STEPS + 1)[1:, None]
+    for command in path:
+        op, args = command[0], [float(v) for v in command[1:]]
+        if op in ("M", "L"):
+            current = (args[0], args[1])
+            points.append(current)
+        elif op == "Q":
+            p0, p1, p2 = np.array(current), np.array(args[0:2]), np.array(args[2:4])
+            points.extend(map(tuple, (1 - t) ** 2 * p0 + 2 * (1 - t) * t * p1 + t ** 2 * p2))
+            current = (args[2], args[3])
+        elif op == "C":
+            p0, p1, p2, p3 = np.array(current), np.array(args[0:2]), np.array(args[2:4]), np.array(args[4:6])
+            points.extend(map(tuple, (1 - t) ** 3 * p0 + 3 * (1 - t) ** 2 * t * p1
+                              + 3 * (1 - t) * t ** 2 * p2 + t ** 3 * p3))
+            current = (args[4], args[5])
+    return np.asarray(points, dtype=np.float32).reshape(-1, 2)
+
+
+def stroke_polylines(json_data):
+    """Return one point array per freehand stroke in the canvas ``json_data``."""
+    strokes = []
+    for obj in (json_data or {}).get("objects", []):
+        if obj.get("type") == "path" and obj.get("path"):
+            points = _path_points(obj["path"])
+            if len(points):
+                strokes.append((points, float(obj.get("strokeWidth", 1))))
+    return strokes
+
+
+def rasterize_strokes(json_data, size=OCR_INPUT_SIZE):
+    """Draw the canvas strokes into a ``size`` uint8 image, white ink on black.
+
+    The drawing is cropped to its bounding box, scaled to fit inside a fixed
+    margin with its aspect ratio kept, and centered. Returns None if nothing
+    has been drawn.
+    """
+    strokes = stroke_polylines(json_data)
+    if not strokes:
+        return None
+    all_points = np.concatenate([points for points, _ in strokes])
+    low = all_points.min(axis=0)
+    extent = max(float((all_points.max(axis=0) - low).max()), 1.0)
+    width, height = size
+    scale = (min(width, height) - 2 * STROKE_MARGIN) / extent
+    offset = (np.array([width, height]) - (all_points.max(axis=0) - low) * scale) / 2
+
+    image = np.zeros((height, width), np.uint8)
+    for points, stroke_width in strokes:
+        pts = np.round((points - low) * scale + offset).astype(np.int32)
+        # Strokes come out about as thick as the bitmap pipeline's dilated ink
+        thickness = max(2, int(round(stroke_width * scale * 2)))
+        if len(pts) == 1:
+            cv2.circle(image, (int(pts[0][0]), int(pts[0][1])), max(1, thickness // 2), 255, -1)
+        else:
+            cv2.polylines(image, [pts], False, 255, thickness)
+    return image
+
+
+def stroke_glyph(json_data):
+    """Draw the canvas strokes at their drawn size and width, white on black, for the letter classifier.
+
+    The strokes counterpart of ``letter_glyph``: the drawing is cropped to
+    its ink but neither scaled nor thickened, unlike ``rasterize_strokes``.
+    Returns None if nothing has been drawn.
+    """
+    strokes = stroke_polylines(json_data)
+    if not strokes:
+        return None
+    all_points = np.concatenate([points for points, _ in strokes])
+    pad = max(stroke_width for _, stroke_width in strokes) / 2 + 1
+    low = all_points.min(axis=0) - pad
+    width, height = np.ceil(all_points.max(axis=0) - low + pad).astype(int) + 1
+
+    image = np.zeros((height, width), np.uint8)
+    for points, stroke_width in strokes:
+        pts = np.round(points - low).astype(np.int32)
+        thickness = max(1, int(round(stroke_width)))
+        if len(pts) == 1:
+            cv2.circle(image, (int(pts[0][0]), int(pts[0][1])), max(1, thickness // 2), 255, -1)
+        else:
+            cv2.polylines(image, [pts], False, 255, thickness)
+    return image
+
+
+def canvas_digest(image_data):
+    """Return a short hash identifying the ink drawn on a canvas frame."""
+    mask = ink_mask(image_data)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.asarray(mask.shape, dtype=np.int32).tobytes())
+    h.update(np.packbits(mask).tobytes())
+    return h.hexdigest()
+
+
+class RecognitionCache:
+    """Bounded LRU of recognition results keyed by canvas content and pipeline config."""
+
+    def __init__(self, max_items=512):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, image_data, mode, engine_id):
+        """Build the cache key for a frame recognized with ``mode`` and ``engine_id``."""
+        return canvas_digest(image_data), mode, PIPELINE_VERSION, engine_id
+
+    def get(self, key):
+        """Return the cached result for ``key`` or None, updating hit/miss counters."""
+        with self._lock:
+            result = self._items.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        with self._lock:
+            self._items[key] = result
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def stats(self):
+        """Return hit/miss counters and the number of cached results."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "items": len(self._items)}
@@ -0,0 +1,132 @@
+"""Static lesson content shared by the app and the offline build tools."""
+
+ALPHABET = list("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+# Learning levels with their activities
+LEVELS = {
+    "Level 1 - Alphabets": [
+        "Learn the alphabet with pronunciation",
+        "Practice letter writing",
+        "Letter tracing game",
+        "Alphabet song (Audio-Visual)",
+        "Speech practice with AI",
+        "Flashcards for letter-to-sound association"
+    ],
+    "Level 2 - Basic Words": [
+        "Common words with meanings",
+        "Pronunciation test with AI",
+        "Word association game",
+        "Spelling quizzes",
+        "Listening comprehension (Audio)",
+        "Word tracing exercises"
+    ],
+    "Level 3 - Sentences": [
+        "Forming basic sentences",
+        "Fill in the blanks exercise",
+        "Jumbled sentences game",
+        "Interactive chat with AI",
+        "Sentence dictation",
+        "Basic grammar rules (Subject-verb agreement)"
+    ],
+    "Level 4 - Conversations": [
+        "Everyday dialogues practice",
+        "Role-playing with AI chatbot",
+        "Speaking challenges with pronunciation check",
+        "Listening comprehension with native speaker audio",
+        "Storytelling practice",
+        "Common phrases & idioms"
+    ]
+}
+
+WORDS = {
+    "apple": "A fruit that is usually red or green.",
+    "dog": "A domesticated carnivorous mammal.",
+    "school": "A place where children go to learn.",
+    "book": "A set of written or printed pages.",
+    "table": "A flat surface with four legs."
+}
+
+# Sentence bank with grammar categories
+SENTENCES = [
+    # Verb Tenses
+    {"sentence": "I ____ to school every day.", "answer": "go", "category": "Present Tense",
+     "explanation": "Use the present tense 'go' for habits or routines (e.g., 'I go,' 'She goes')."},
+    {"sentence": "Yesterday, she ____ a cake.", "answer": "baked", "category": "Past Tense",
+     "explanation": "Use the past tense 'baked' for actions completed in the past."},
+    {"sentence": "Tomorrow, we ____ to the park.", "answer": "will go", "category": "Future Tense",
+     "explanation": "Use 'will + verb' (e.g., 'will go') for future actions."},
+
+    # Subject-Verb Agreement
+    {"sentence": "The dog ____ loudly.", "answer": "barks", "category": "Subject-Verb Agreement",
+     "explanation": "Singular subjects like 'The dog' take singular verbs (e.g., 'barks,' not 'bark')."},
+    {"sentence": "The cats ____ in the yard.", "answer": "play", "category": "Subject-Verb Agreement",
+     "explanation": "Plural subjects like 'The cats' take plural verbs (e.g., 'play,' not 'plays')."},
+
+    # Articles
+    {"sentence": "She has ____ apple.", "answer": "an", "category": "Articles",
+     "explanation": "Use 'an' before words starting with a vowel sound (e.g., 'an apple')."},
+    {"sentence": "He rides ____ bike to school.", "answer": "a", "category": "Articles",
+     "explanation": "Use 'a' before words starting with a consonant sound (e.g., 'a bike')."},
+
+    # Prepositions
+    {"sentence": "The book is ____ the table.", "answer": "on", "category": "Prepositions",
+     "explanation": "Use 'on' for surfaces (e.g., 'on the table')."},
+    {"sentence": "We meet ____ noon.", "answer": "at", "category": "Prepositions",
+     "explanation": "Use 'at' for specific times (e.g., 'at noon')."},
+
+    # Pronouns
+    {"sentence": "____ is my best friend.", "answer": "She", "category": "Pronouns",
+     "explanation": "Use 'She' as a subject pronoun for a female (e.g., 'She is,' not 'Her is')."},
+    {"sentence": "I gave the book to ____.", "answer": "them", "category": "Pronouns",
+     "explanation": "Use 'them' as an object pronoun for plural people (e.g., 'to them')."},
+
+    # Adjectives/Adverbs
+    {"sentence": "The ____ cat slept all day.", "answer": "soft", "category": "Adjectives",
+     "explanation": "Use adjectives like 'soft' to describe nouns (e.g., 'soft cat')."},
+    {"sentence": "He runs very ____.", "answer": "quickly", "category": "Adverbs",
+     "explanation": "Use adverbs like 'quickly' to describe verbs (e.g., 'runs quickly')."}
+]
+
+# Dialogues with scenarios and multiple acceptable responses
+DIALOGUES = [
+    {
+        "scenario": "You meet a new friend at a party.",
+        "dialogue": "Hello! How are you today?",
+        "responses": ["I'm good!", "I'm great, thanks!", "Doing well, how about you?"],
+        "follow_up": "Nice to meet you! What’s your favorite hobby?"
+    },
+    {
+        "scenario": "You’re asking a stranger for their name.",
+        "dialogue": "Hi, what’s your name?",
+        "responses": ["My name is John.", "I’m John!", "John’s my name."],
+        "follow_up": "Cool name! Where are you from?"
+    },
+    {
+        "scenario": "You’re a tourist asking about someone’s hometown.",
+        "dialogue": "Where are you from?",
+        "responses": ["I’m from India.", "I come from India!", "India’s my home."],
+        "follow_up": "That’s awesome! What’s it like there?"
+    },
+    {
+        "scenario": "You’re ordering food at a café.",
+        "dialogue": "What would you like to eat?",
+        "responses": ["I’d like a sandwich.", "A sandwich, please!", "Can I have a sandwich?"],
+        "follow_up": "Great choice! Anything to drink?"
+    }
+]
+
+
+def completed_sentence(sentence_data):
+    """Return the sentence with the blank filled in by the correct answer."""
+    return sentence_data["sentence"].replace("____", sentence_data["answer"])
+
+def pronunciation_texts():
+    """Return every static text the app can pronounce, without duplicates."""
+    texts = list(ALPHABET)
+    texts.extend(WORDS)
+    texts.extend(completed_sentence(s) for s in SENTENCES)
+    for d in DIALOGUES:
+        texts.append(d["dialogue"])
+        texts.extend(d["responses"])
+        texts.append(d["follow_up"])
+    return list(dict.fromkeys(texts))
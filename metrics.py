@@ -0,0 +1,241 @@
+"""In-process timing spans, histograms and cache hit rates.
+
+Code under measurement wraps a block in ``metrics.span(name)``; the block's
+duration goes into a histogram for ``name`` with fixed, Prometheus-style
+buckets. Caches are registered with a function returning their ``stats()``
+dict, and their hit rates are read from it when metrics are exported, so
+cache lookups pay nothing extra.
+
+Collection is off unless the registry is created with ``enabled=True``;
+``span`` then returns one shared do-nothing context manager, so an
+instrumented rerun costs a method call per span.
+
+Metrics are exported as Prometheus text, by ``render()``, by a background
+thread writing it to a file (``start_file_dump``) or by a small HTTP
+server (``start_http_server``) that Prometheus can scrape::
+
+    METRICS=1 METRICS_PORT=9108 streamlit run app.py
+    curl localhost:9108/metrics
+"""
+import bisect
+import os
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "english_ai"
+# Upper bounds in seconds: 0.5 ms to 30 s, roughly doubling
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DUMP_INTERVAL = 10.0
+
+_NULL_SPAN = nullcontext()
+
+
+class Histogram:
+    """Count, sum and per-bucket counts of observed durations."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Estimate the ``q`` quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                low = BUCKETS[i - 1] if i else 0.0
+                high = min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return self.max
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """Thread-safe registry of span histograms, counters and cache stats sources."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._histograms = {}
+        self._counters = {}
+        self._caches = {}
+        self._lock = threading.Lock()
+
+    def span(self, name):
+        """Return a context manager that times its block into histogram ``name``."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def observe_all(self, prefix, timings):
+        """Observe every ``{stage: seconds}`` entry of a timings dict as ``prefix.stage``."""
+        for stage, seconds in timings.items():
+            self.observe(f"{prefix}.{stage}", seconds)
+
+    def count(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def register_cache(self, name, stats):
+        """Report hit rates for a cache; ``stats()`` returns a dict with ``hits`` and ``misses``."""
+        with self._lock:
+            self._caches[name] = stats
+
+    def cache_rates(self):
+        """Return ``{cache: (hits, misses)}`` read from every registered cache now."""
+        with self._lock:
+            caches = dict(self._caches)
+        rates = {}
+        for name, stats in caches.items():
+            try:
+                values = stats()
+            except Exception:
+                continue
+            # Disk hits of the audio cache are still hits; only renders are misses
+            rates[name] = (values.get("hits", 0) + values.get("disk_hits", 0), values.get("misses", 0))
+        return rates
+
+    def snapshot(self):
+        """Return ``(histograms, counters)`` copies that are safe to read while spans record."""
+        with self._lock:
+            histograms = {}
+            for name, h in self._histograms.items():
+                copy = Histogram()
+                copy.counts, copy.count, copy.total, copy.max = list(h.counts), h.count, h.total, h.max
+                histograms[name] = copy
+            return histograms, dict(self._counters)
+
+    def summary(self):
+        """Return one row per span: name, count, mean, p50, p95 and max in milliseconds."""
+        histograms, _ = self.snapshot()
+        return [
+            {
+                "span": name,
+                "count": h.count,
+                "mean_ms": h.total / h.count * 1000,
+                "p50_ms": h.quantile(0.5) * 1000,
+                "p95_ms": h.quantile(0.95) * 1000,
+                "max_ms": h.max * 1000,
+            }
+            for name, h in sorted(histograms.items())
+        ]
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        histograms, counters = self.snapshot()
+        lines = [
+            f"# HELP {PREFIX}_span_seconds Time spent in instrumented spans.",
+            f"# TYPE {PREFIX}_span_seconds histogram",
+        ]
+        for name, h in sorted(histograms.items()):
+            cumulative = 0
+            for bound, n in zip(BUCKETS + ("+Inf",), h.counts):
+                cumulative += n
+                lines.append(f'{PREFIX}_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{PREFIX}_span_seconds_sum{{span="{name}"}} {h.total:.6f}')
+            lines.append(f'{PREFIX}_span_seconds_count{{span="{name}"}} {h.count}')
+
+        lines += [f"# HELP {PREFIX}_events_total Counted events.", f"# TYPE {PREFIX}_events_total counter"]
+        for name, value in sorted(counters.items()):
+            lines.append(f'{PREFIX}_events_total{{event="{name}"}} {value}')
+
+        lines += [f"# HELP {PREFIX}_cache_requests_total Cache lookups by result.",
+                  f"# TYPE {PREFIX}_cache_requests_total counter"]
+        for name, (hits, misses) in sorted(self.cache_rates().items()):
+            lines.append(f'{PREFIX}_cache_requests_total{{cache="{name}",result="hit"}} {hits}')
+            lines.append(f'{PREFIX}_cache_requests_total{{cache="{name}",result="miss"}} {misses}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write ``render()`` to ``path`` atomically, for node_exporter's textfile collector."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def start_file_dump(self, path, interval=DUMP_INTERVAL):
+        """Rewrite ``path`` every ``interval`` seconds from a daemon thread."""
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write(path)
+                except OSError:
+                    pass
+
+        thread = threading.Thread(target=run, name="metrics-dump", daemon=True)
+        thread.start()
+        return thread
+
+    def start_http_server(self, port, host="127.0.0.1"):
+        """Serve ``render()`` at ``/metrics`` on ``host:port`` from a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
@@ -0,0 +1,180 @@
+"""Tesseract engines for recognizing preprocessed handwriting images.
+
+``pytesseract`` starts a new ``tesseract`` process for every call, loads the
+language model from disk and passes the image through a temp file. When the
+``tesserocr`` binding is installed, ``TesseractPool`` instead keeps a bounded
+set of warm in-process API handles that are shared by all sessions and fed
+numpy arrays directly. ``create_engine`` picks the best available engine
+(the pool only if a probe handle can be opened) and logs its choice;
+both expose ``recognize(image) -> (text, confidence)`` and
+``recognize_chars(image) -> [(char, confidence), ...]``. Words are read in a
+single line-mode pass (``--psm 7``) rather than one call per letter.
+"""
+import functools
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+LETTER_WHITELIST = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+SINGLE_CHAR_PSM = 10
+LINE_PSM = 7
+
+
+class TesseractPool:
+    """Bounded pool of warm ``tesserocr`` API handles."""
+
+    def __init__(self, size=None, lang="eng", psm=SINGLE_CHAR_PSM, whitelist=LETTER_WHITELIST):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+        self.size = size or os.cpu_count() or 1
+        self.lang = lang
+        self.psm = psm
+        self.whitelist = whitelist
+        self.engine_id = f"tesserocr:{lang}:psm{psm}:{whitelist}"
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._handles = []
+
+    def _create(self):
+        api = tesserocr.PyTessBaseAPI(lang=self.lang, psm=tesserocr.PSM(self.psm), oem=tesserocr.OEM.DEFAULT)
+        api.SetVariable("tessedit_char_whitelist", self.whitelist)
+        with self._lock:
+            self._handles.append(api)
+        return api
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a handle, creating one lazily until the pool is full."""
+        self._slots.acquire()
+        try:
+            try:
+                api = self._idle.get_nowait()
+            except queue.Empty:
+                api = self._create()
+            try:
+                yield api
+            finally:
+                self._idle.put(api)
+        finally:
+            self._slots.release()
+
+    def recognize(self, image):
+        """Return the most confident ``(text, confidence)`` in a grayscale uint8 image."""
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        height, width = image.shape
+        with self.acquire() as api:
+            api.SetImageBytes(image.tobytes(), width, height, 1, width)
+            api.Recognize()
+            level = tesserocr.RIL.WORD
+            recognized_text = ""
+            max_confidence = 0
+            for word in tesserocr.iterate_level(api.GetIterator(), level):
+                text = (word.GetUTF8Text(level) or "").strip()
+                confidence = word.Confidence(level)
+                if text and confidence > max_confidence:
+                    recognized_text = text.lower()
+                    max_confidence = confidence
+            api.Clear()
+        return recognized_text, max_confidence
+
+    def recognize_chars(self, image):
+        """Return ``(char, confidence)`` for every symbol in the image, left to right."""
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        height, width = image.shape
+        with self.acquire() as api:
+            api.SetImageBytes(image.tobytes(), width, height, 1, width)
+            api.Recognize()
+            level = tesserocr.RIL.SYMBOL
+            chars = []
+            for symbol in tesserocr.iterate_level(api.GetIterator(), level):
+                text = (symbol.GetUTF8Text(level) or "").strip()
+                if text:
+                    chars.append((text.lower(), symbol.Confidence(level)))
+            api.Clear()
+        return chars
+
+    def close(self):
+        """Release every handle the pool created."""
+        with self._lock:
+            handles, self._handles = self._handles, []
+        for api in handles:
+            api.End()
+
+
+class PytesseractEngine:
+    """Fallback engine that shells out to the ``tesseract`` binary per call."""
+
+    def __init__(self, psm=SINGLE_CHAR_PSM, whitelist=LETTER_WHITELIST):
+        import pytesseract
+
+        self._pytesseract = pytesseract
+        self.config = f"--psm {psm} --oem 3 -c tessedit_char_whitelist={whitelist}"
+        self.engine_id = f"pytesseract:{self.config}"
+
+    def recognize(self, image):
+        """Return the most confident ``(text, confidence)`` in a grayscale uint8 image."""
+        result = self._pytesseract.image_to_data(
+            image, config=self.config, output_type=self._pytesseract.Output.DICT
+        )
+        recognized_text = ""
+        max_confidence = 0
+        for i, text in enumerate(result['text']):
+            if text.strip():
+                confidence = float(result['conf'][i])
+                if confidence > max_confidence:
+                    recognized_text = text.strip().lower()
+                    max_confidence = confidence
+        return recognized_text, max_confidence
+
+    def recognize_chars(self, image):
+        """Return ``(char, confidence)`` per character; pytesseract only reports word confidences."""
+        result = self._pytesseract.image_to_data(
+            image, config=self.config, output_type=self._pytesseract.Output.DICT
+        )
+        chars = []
+        for i, text in enumerate(result['text']):
+            confidence = float(result['conf'][i])
+            chars.extend((char, confidence) for char in text.strip().lower())
+        return chars
+
+    def close(self):
+        pass
+
+
+@functools.lru_cache(maxsize=None)
+def probe_tesserocr(lang="eng"):
+    """Open and close one tesserocr handle; returns (usable, error).
+
+    A successful import does not mean libtesseract can find its language
+    data, so the pool is only used once a real handle has been built.
+    """
+    if tesserocr is None:
+        return False, "tesserocr is not installed"
+    try:
+        api = tesserocr.PyTessBaseAPI(lang=lang)
+    except Exception as e:
+        return False, str(e) or type(e).__name__
+    api.End()
+    return True, None
+
+
+def create_engine(size=None, psm=SINGLE_CHAR_PSM):
+    """Return a warm ``TesseractPool`` if a tesserocr handle can be opened, else ``PytesseractEngine``."""
+    usable, error = probe_tesserocr()
+    if usable:
+        engine = TesseractPool(size=size, psm=psm)
+        logger.info("OCR engine for psm %d: tesserocr pool of %d handles", psm, engine.size)
+        return engine
+    logger.info("OCR engine for psm %d: pytesseract subprocesses (%s)", psm, error)
+    return PytesseractEngine(psm=psm)
@@ -0,0 +1,50 @@
+"""Compact per-session practice state.
+
+Everything the levels remember about a session between reruns, apart from
+widget values and XP (``progress_store.User``), lives in one
+``PracticeState`` with fixed slots instead of a dozen session-state keys.
+Current items are integer ids into the shared ``ContentStore``, never
+copies of the items; grammar progress is an ``array`` of counters indexed
+by each category's position in the store's shared category tuple; and the
+per-level schedulers sit in a four-slot list.
+
+``benchmarks/bench_session.py`` measures the bytes this saves per session.
+"""
+from array import array
+
+LEVEL_COUNT = 4
+
+
+class PracticeState:
+    """One session's current items, counters and schedulers."""
+
+    __slots__ = (
+        "word_id", "sentence_id", "dialogue_id",
+        "conversation_step", "conversation_streak",
+        "canvas_key", "letter_input_key",
+        "grammar_correct", "schedulers",
+    )
+
+    def __init__(self):
+        self.word_id = None
+        self.sentence_id = None
+        self.dialogue_id = None
+        self.conversation_step = 0  # 0 = initial line, 1 = follow-up
+        self.conversation_streak = 0
+        self.canvas_key = 0  # Bumped to clear the canvas widget
+        self.letter_input_key = 0  # Bumped to clear the typed letter box
+        self.grammar_correct = None  # array("H"), created on the first level 3 visit
+        self.schedulers = [None] * LEVEL_COUNT
+
+    def grammar_counts(self, categories):
+        """Return the correct-answer counters, one per entry of the shared ``categories`` tuple."""
+        if self.grammar_correct is None or len(self.grammar_correct) != len(categories):
+            self.grammar_correct = array("H", bytes(2 * len(categories)))
+        return self.grammar_correct
+
+    def add_grammar_correct(self, categories, category):
+        if category not in categories:
+            return
+        counts = self.grammar_counts(categories)
+        index = categories.index(category)
+        counts[index] = min(counts[index] + 1, 65535)
@@ -0,0 +1,159 @@
+"""Durable learner progress (XP, level, streak) in SQLite with write-behind.
+
+Sessions never touch the database while grading. ``record`` only replaces
+the learner's latest snapshot in an in-memory buffer, so a burst of answers
+from one learner coalesces into a single row write. A background thread
+commits the buffer every few seconds (or sooner once it grows large) in one
+transaction, so hundreds of grading sessions cost a handful of commits per
+second instead of one per answer. The database runs in WAL mode, so reads
+from new sessions do not block behind those commits.
+
+Snapshots still in the buffer are flushed when the process exits; at most
+``flush_interval`` seconds of progress is lost if it is killed outright.
+"""
+import atexit
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PROGRESS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "progress.db")
+FLUSH_INTERVAL = 2.0
+# Flush early once this many learners have unsaved progress
+MAX_PENDING = 500
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS progress (
+    learner_id TEXT PRIMARY KEY,
+    xp INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    streak INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+UPSERT = """
+INSERT INTO progress (learner_id, xp, level, streak, updated_at) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (learner_id) DO UPDATE SET
+    xp = excluded.xp, level = excluded.level, streak = excluded.streak, updated_at = excluded.updated_at
+"""
+
+
+class ProgressStore:
+    """Process-wide learner progress store, safe to share across sessions."""
+
+    def __init__(self, path=DEFAULT_PROGRESS_PATH, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        self._db_lock = threading.Lock()
+        self._pending = {}  # learner id -> (xp, level, streak, updated_at)
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self.flushes = 0
+        self.rows_written = 0
+        self._thread = threading.Thread(target=self._run, name="progress-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def load(self, learner_id):
+        """Return ``(xp, level, streak)`` for a learner, or None if never saved."""
+        with self._pending_lock:
+            pending = self._pending.get(learner_id)
+        if pending is not None:
+            return pending[:3]
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT xp, level, streak FROM progress WHERE learner_id = ?", (learner_id,)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def record(self, learner_id, xp, level, streak):
+        """Buffer the learner's latest progress; it is committed by the flush thread."""
+        with self._pending_lock:
+            self._pending[learner_id] = (xp, level, streak, time.time())
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Commit every buffered snapshot in one transaction."""
+        with self._pending_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+        rows = [(learner_id, *values) for learner_id, values in batch.items()]
+        with self._db_lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany(UPSERT, rows)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                # Put the batch back unless newer snapshots arrived meanwhile
+                with self._pending_lock:
+                    for learner_id, values in batch.items():
+                        self._pending.setdefault(learner_id, values)
+                raise
+        self.flushes += 1
+        self.rows_written += len(rows)
+        return len(rows)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass  # Retried on the next interval
+
+    def stats(self):
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {"pending": pending, "flushes": self.flushes, "rows_written": self.rows_written}
+
+    def close(self):
+        """Stop the flush thread and commit anything still buffered."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+
+class User:
+    """A learner's XP, level and streak, saved to a ``ProgressStore`` on every change."""
+
+    __slots__ = ("learner_id", "xp", "level", "streak", "_store")
+
+    def __init__(self, learner_id, store=None):
+        self.learner_id = learner_id
+        self._store = store
+        self.xp, self.level, self.streak = (store.load(learner_id) if store else None) or (0, 1, 0)
+
+    def earn_xp(self, amount):
+        """Add XP; returns True if the learner levelled up."""
+        self.xp += amount
+        levelled_up = self.xp >= self.level * 10
+        if levelled_up:
+            self.level += 1
+            self.xp = 0
+        self._save()
+        return levelled_up
+
+    def maintain_streak(self, correct):
+        self.streak = self.streak + 1 if correct else 0
+        self._save()
+
+    def _save(self):
+        if self._store is not None:
+            self._store.record(self.learner_id, self.xp, self.level, self.streak)
@@ -0,0 +1,337 @@
+"""Offline pronunciation scoring against the app's own reference audio.
+
+A learner's clip is compared with the text-to-speech audio of the letter,
+word or sentence they were asked to say. Both are turned into MFCC features
+(with deltas), computed for all frames at once with NumPy: framing, window,
+FFT, mel filterbank, log and DCT are each one array operation. Leading and
+trailing silence is trimmed and every coefficient is normalized per clip,
+so the microphone, volume and voice matter less than what was said.
+
+The two feature sequences are aligned with dynamic time warping inside a
+Sakoe-Chiba band around the diagonal, so a slower or faster speaker still
+lines up but a clip of a different length cannot match by skipping most of
+it. The band's anti-diagonals are filled one vectorized step at a time. The
+mean frame distance along the best path becomes a 0-100 score.
+
+Reference features are computed once per text and kept in a bounded LRU
+shared by every session. ``PronunciationScorer.score_many`` grades a batch
+of clips, computing each reference once; the command line grades a CSV of
+``path,text`` rows on a process pool::
+
+    python pronunciation.py clips.csv --workers 4 --out scores.csv
+
+WAV audio is decoded with the standard library; MP3 (gTTS) and browser
+recordings in other formats need ``ffmpeg`` on the PATH.
+"""
+import argparse
+import csv
+import io
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import wave
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 400  # 25 ms
+HOP_LENGTH = 160  # 10 ms
+N_FFT = 512
+N_MELS = 40
+N_MFCC = 13
+PRE_EMPHASIS = 0.97
+# Frames this far (natural log of power) below the loudest one count as silence
+SILENCE_RANGE = np.log(10.0 ** 4)  # 40 dB
+# The warping path may stray this fraction of the longer clip from the diagonal
+BAND_FRACTION = 0.2
+MIN_BAND = 10
+# Mean frame distances that score 100 and 0; everything in between is linear.
+# Checked against espeak-ng voices with benchmarks/calibrate_pronunciation.py
+GOOD_DISTANCE = 2.0
+BAD_DISTANCE = 2.5
+MAX_REFERENCES = 512
+
+
+class PronunciationScore(NamedTuple):
+    score: float  # 0-100
+    distance: float  # Mean aligned frame distance; inf when the clips cannot be aligned
+    frames: int  # Speech frames in the learner's clip
+    seconds: float  # Time spent scoring, not counting reference synthesis
+
+
+# Decoding
+
+def decode_audio(data, sample_rate=SAMPLE_RATE):
+    """Return mono float32 samples in [-1, 1] at ``sample_rate`` from WAV or (with ffmpeg) any audio bytes."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return _decode_wav(data, sample_rate)
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise ValueError("only WAV audio can be decoded without ffmpeg; install ffmpeg or use TTS_BACKEND=espeak")
+    result = subprocess.run(
+        [ffmpeg, "-nostdin", "-loglevel", "error", "-i", "pipe:0",
+         "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "pipe:1"],
+        input=data, capture_output=True,
+    )
+    if result.returncode:
+        raise ValueError(f"ffmpeg could not decode the audio: {result.stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(result.stdout, np.int16).astype(np.float32) / 32768.0
+
+
+def _decode_wav(data, sample_rate):
+    with wave.open(io.BytesIO(data)) as wav:
+        channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, np.uint8).astype(np.float32) - 128) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(raw, "<i2").astype(np.float32) / 32768.0
+    elif width == 4:
+        samples = np.frombuffer(raw, "<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"unsupported WAV sample width: {width * 8} bits")
+    if channels > 1:
+        samples = samples[: len(samples) // channels * channels].reshape(-1, channels).mean(axis=1)
+    if rate != sample_rate and len(samples):
+        # Linear interpolation is enough for 40 mel bands below 8 kHz
+        positions = np.arange(0, len(samples) - 1, rate / sample_rate)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+    return samples
+
+
+# Features
+
+@lru_cache(maxsize=None)
+def _filters():
+    """Return the (window, mel filterbank, DCT matrix) shared by every call."""
+    window = np.hamming(FRAME_LENGTH).astype(np.float32)
+
+    def mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    edges = 700.0 * (10.0 ** (np.linspace(mel(0), mel(SAMPLE_RATE / 2), N_MELS + 2) / 2595.0) - 1.0)
+    bins = np.fft.rfftfreq(N_FFT, 1.0 / SAMPLE_RATE)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    filterbank = np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+
+    n = np.arange(N_MELS)
+    dct = np.cos(np.pi / N_MELS * (n[None, :] + 0.5) * np.arange(N_MFCC)[:, None]).astype(np.float32)
+    return window, filterbank, dct
+
+
+def log_mel(samples):
+    """Return the (frames, N_MELS) log mel power spectrogram of 16 kHz ``samples``."""
+    if len(samples) < FRAME_LENGTH:
+        samples = np.pad(samples, (0, FRAME_LENGTH - len(samples)))
+    samples = np.append(samples[:1], samples[1:] - PRE_EMPHASIS * samples[:-1])
+    window, filterbank, _ = _filters()
+    frames = np.lib.stride_tricks.sliding_window_view(samples, FRAME_LENGTH)[::HOP_LENGTH] * window
+    power = np.abs(np.fft.rfft(frames, N_FFT)) ** 2
+    return np.log(power @ filterbank.T + 1e-10)
+
+
+def features(samples):
+    """Return normalized MFCCs and their deltas, one row per speech frame.
+
+    Silence before and after the utterance is dropped; an empty array means
+    the clip held no speech.
+    """
+    mel = log_mel(np.asarray(samples, dtype=np.float32))
+    energy = mel.max(axis=1)
+    voiced = np.flatnonzero(energy > energy.max() - SILENCE_RANGE)
+    if len(voiced) < 3 or not np.isfinite(energy).all() or energy.max() < np.log(1e-6):
+        return np.empty((0, 2 * (N_MFCC - 1)), np.float32)
+    mel = mel[voiced[0]: voiced[-1] + 1]
+    _, _, dct = _filters()
+    mfcc = (mel @ dct.T)[:, 1:]  # c0 is loudness
+    mfcc = (mfcc - mfcc.mean(axis=0)) / (mfcc.std(axis=0) + 1e-3)
+    delta = np.gradient(mfcc, axis=0)
+    return np.hstack([mfcc, delta]).astype(np.float32)
+
+
+# Alignment
+
+def dtw_distance(query, reference, band_fraction=BAND_FRACTION):
+    """Return the mean Euclidean frame distance along the best banded warping path.
+
+    The path may stray ``band_fraction`` of the longer sequence (at least
+    ``MIN_BAND`` frames) from the diagonal; returns inf if no path fits.
+    """
+    n, m = len(query), len(reference)
+    if not n or not m:
+        return float("inf")
+    squared = (query * query).sum(1)[:, None] + (reference * reference).sum(1)[None, :] - 2.0 * query @ reference.T
+    cost = np.sqrt(np.maximum(squared, 0.0))
+    band = max(MIN_BAND, int(band_fraction * max(n, m)))
+    rows, cols = np.indices((n, m))
+    cost[np.abs(cols - rows * (m / n)) > band] = np.inf
+
+    # Cells on one anti-diagonal depend only on the two before it, so each is one vector step
+    total = np.full((n + 1, m + 1), np.inf)
+    total[0, 0] = 0.0
+    for k in range(2, n + m + 1):
+        i = np.arange(max(1, k - m), min(n, k - 1) + 1)
+        j = k - i
+        best = np.minimum(np.minimum(total[i - 1, j - 1], total[i - 1, j]), total[i, j - 1])
+        total[i, j] = cost[i - 1, j - 1] + best
+    return float(total[n, m] / (n + m))
+
+
+def distance_score(distance, good=GOOD_DISTANCE, bad=BAD_DISTANCE):
+    """Map a mean frame distance to 0-100."""
+    if not np.isfinite(distance):
+        return 0.0
+    return float(100.0 * min(1.0, max(0.0, (bad - distance) / (bad - good))))
+
+
+# Scoring
+
+class PronunciationScorer:
+    """Scores learner clips against reference features cached per text.
+
+    ``reference_audio(text)`` returns the reference recording's bytes,
+    usually the app's text-to-speech audio for ``text``.
+    """
+
+    def __init__(self, reference_audio, max_references=MAX_REFERENCES):
+        self.reference_audio = reference_audio
+        self.max_references = max_references
+        self._references = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def reference(self, text):
+        """Return the reference features for ``text``, synthesizing and extracting them on first use."""
+        with self._lock:
+            cached = self._references.get(text)
+            if cached is not None:
+                self._references.move_to_end(text)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        reference = features(decode_audio(self.reference_audio(text)))
+        with self._lock:
+            self._references[text] = reference
+            while len(self._references) > self.max_references:
+                self._references.popitem(last=False)
+        return reference
+
+    def score(self, audio, text):
+        """Score the clip ``audio`` (bytes) as an attempt to say ``text``."""
+        reference = self.reference(text)
+        start = time.perf_counter()
+        return score_features(features(decode_audio(audio)), reference, start)
+
+    def score_many(self, clips):
+        """Score ``(audio, text)`` pairs in order, extracting each text's reference once."""
+        return [self.score(audio, text) for audio, text in clips]
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._references)}
+
+
+def score_features(query, reference, start=None):
+    start = time.perf_counter() if start is None else start
+    distance = dtw_distance(query, reference)
+    return PronunciationScore(distance_score(distance), distance, len(query), time.perf_counter() - start)
+
+
+# Batch grading: references are made once in the parent and shipped to every worker
+
+_references = None
+
+
+def _init_worker(references):
+    global _references
+    _references = references
+
+
+def _score_file(args):
+    path, text = args
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            result = score_features(features(decode_audio(f.read())), _references[text], start)
+        return path, text, result.score, result.distance, result.seconds, ""
+    except Exception as e:
+        return path, text, 0.0, float("inf"), time.perf_counter() - start, f"{type(e).__name__}: {e}"
+
+
+def read_manifest(f):
+    """Return ``(path, text)`` pairs from a CSV with ``path`` and ``text`` columns."""
+    reader = csv.DictReader(f)
+    if not reader.fieldnames or not {"path", "text"} <= set(reader.fieldnames):
+        raise ValueError("the manifest needs path and text columns")
+    return [(row["path"], row["text"]) for row in reader]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a batch of recorded pronunciation attempts.")
+    parser.add_argument("manifest", help="CSV with the path of each clip and the text it should say")
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: all cores)")
+    parser.add_argument("--out", help="write path, text, score, distance and milliseconds per clip to this CSV")
+    parser.add_argument("--tts-backend", default=os.environ.get("TTS_BACKEND"),
+                        help="backend for the reference audio (default: TTS_BACKEND or gtts)")
+    args = parser.parse_args(argv)
+
+    from audio_cache import AudioCache, DEFAULT_CACHE_DIR
+    from tts_backends import get_backend
+
+    with open(args.manifest, newline="", encoding="utf-8") as f:
+        jobs = read_manifest(f)
+    base = os.path.dirname(os.path.abspath(args.manifest))
+    jobs = [(os.path.join(base, path), text) for path, text in jobs]
+    if not jobs:
+        print(f"No clips listed in {args.manifest}", file=sys.stderr)
+        return 1
+
+    backend = get_backend(args.tts_backend)
+    cache = AudioCache(os.environ.get("TTS_CACHE_DIR", DEFAULT_CACHE_DIR))
+    start = time.perf_counter()
+    texts = list(dict.fromkeys(text for _, text in jobs))
+    # Same keys as the app's audio, so clips it already played are not synthesized again
+    references = {
+        text: features(decode_audio(
+            cache.get_or_create((backend.name, text, "en", False), lambda: backend.synthesize(text))))
+        for text in texts
+    }
+    reference_seconds = time.perf_counter() - start
+
+    workers = args.workers or os.cpu_count()
+    start = time.perf_counter()
+    if workers <= 1:
+        _init_worker(references)
+        results = [_score_file(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(references,)) as pool:
+            results = list(pool.map(_score_file, jobs, chunksize=max(1, min(32, len(jobs) // (workers * 4)))))
+    seconds = time.perf_counter() - start
+
+    if args.out:
+        with open(args.out, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["path", "text", "score", "distance", "ms", "error"])
+            for path, text, score, distance, clip_seconds, error in results:
+                writer.writerow([path, text, f"{score:.1f}", f"{distance:.3f}", f"{clip_seconds * 1000:.1f}", error])
+
+    errors = sum(1 for *_, error in results if error)
+    mean = sum(score for _, _, score, *_ in results) / len(results)
+    print(f"Scored {len(results)} clips in {seconds:.1f}s ({len(results) / max(seconds, 1e-9):.1f} clips/s, "
+          f"{workers} workers) after {reference_seconds:.1f}s preparing {len(texts)} references; "
+          f"mean score {mean:.1f}, {errors} errors")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""Handwriting recognition without the UI, and a batch worksheet grader.
+
+``Recognizer.recognize`` turns a canvas frame or scanned image into a
+``Recognition`` of the recognized text, its confidence (percent) and debug
+artifacts: the preprocessed image given to the classifier/OCR, per-letter
+confidences for words, stage timings and whether the result came from the
+cache. It draws nothing, so the app, scripts and worker processes share it.
+
+Letters are read by the NumPy letter classifier from the bare ink crop
+(``handwriting.letter_glyph``, or ``stroke_glyph`` for canvas strokes), the
+input it was trained on. Only below
+``min_confidence`` are they preprocessed (``handwriting.preprocess``) and
+read by Tesseract.
+Words are segmented into glyphs and classified in one batch, falling back
+to a single line-mode Tesseract pass.
+
+The batch command recognizes a directory of scanned worksheet images on a
+process pool; every worker loads the classifier and warms its Tesseract
+engines once::
+
+    python recognition.py scans/ --word --workers 4 --out results.csv
+    python recognition.py scans/ --label-from-name   # a_01.png should read "a"
+
+It reports images/sec, and accuracy when labels are taken from file names.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+import handwriting
+
+# Below this confidence (percent) the letter classifier defers to Tesseract
+MIN_CONFIDENCE = 85
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+
+
+class Recognition(NamedTuple):
+    text: str
+    confidence: float  # Percent; the weakest letter's for words
+    debug: dict  # image, chars, timings, cached
+
+
+class Recognizer:
+    """Letter and word recognition with the classifier, Tesseract or both.
+
+    ``letter_engine`` and ``line_engine`` are ``ocr_engine`` engines for
+    single characters and whole lines, or None when Tesseract is not
+    available. ``cache`` is an optional shared ``handwriting.RecognitionCache``.
+    """
+
+    def __init__(self, classifier=None, letter_engine=None, line_engine=None, cache=None,
+                 min_confidence=MIN_CONFIDENCE):
+        self.classifier = classifier
+        self.letter_engine = letter_engine
+        self.line_engine = line_engine
+        self.cache = cache
+        self.min_confidence = min_confidence
+
+    @property
+    def available(self):
+        return self.classifier is not None or self.letter_engine is not None
+
+    @property
+    def recognizer_id(self):
+        """Identify the classifier/OCR combination so cached results never go stale."""
+        parts = [self.classifier.model_id] if self.classifier is not None else []
+        if self.letter_engine is not None:
+            parts.append(self.letter_engine.engine_id)
+        return "+".join(parts)
+
+    def classify_letter(self, glyph):
+        """Classify a ``handwriting.letter_glyph`` crop; returns (text, confidence), ("", 0) without a classifier."""
+        if self.classifier is None or glyph is None:
+            return "", 0
+        letters, confidences = self.classifier.predict([glyph])
+        return letters[0], confidences[0]
+
+    def ocr_letter(self, image):
+        """Read a preprocessed letter image with Tesseract; returns (text, confidence), ("", 0) without it."""
+        if self.letter_engine is None or image is None:
+            return "", 0
+        return self.letter_engine.recognize(image)
+
+    def read_word(self, image):
+        """Recognize a preprocessed word image and return (text, confidence, per-letter confidences)."""
+        # Classify all segmented letters in one batch; fall back to a single line-mode OCR pass
+        if self.classifier is not None:
+            glyphs, _ = handwriting.segment_glyphs(image)
+            letters, confidences = self.classifier.predict(glyphs)
+            if glyphs and (min(confidences) >= self.min_confidence or self.line_engine is None):
+                return "".join(letters), min(confidences), list(zip(letters, confidences))
+        if self.line_engine is None:
+            return "", 0, []
+        chars = self.line_engine.recognize_chars(image)
+        if not chars:
+            return "", 0, []
+        return "".join(char for char, _ in chars), min(conf for _, conf in chars), chars
+
+    def recognize(self, image_data, word=False, mode=None, json_data=None):
+        """Recognize the letter (or with ``word=True`` the word) drawn in ``image_data``.
+
+        ``mode`` is a ``handwriting`` preprocessing mode (default: the
+        configured one). With ``json_data`` and ``CANVAS_INPUT=strokes`` a
+        letter is rasterized from the canvas strokes instead.
+        """
+        timings = {}
+        if not word and json_data is not None and handwriting.canvas_input_mode() == "strokes":
+            with handwriting.timed_stage(timings, "rasterize"):
+                frame = handwriting.rasterize_strokes(json_data)
+            if frame is None:
+                return Recognition("", 0, {"image": None, "chars": [], "timings": timings, "cached": False})
+            key_mode, preprocess = "strokes", lambda image, timings: image
+        elif word:
+            frame, key_mode, preprocess = image_data, "word-segment", handwriting.preprocess_word
+        else:
+            mode = mode or handwriting.preprocess_mode()
+            if mode == "compare":
+                mode = handwriting.DEFAULT_PREPROCESS_MODE
+            frame, key_mode = image_data, mode
+            preprocess = lambda image, timings: handwriting.preprocess(image, mode, timings)
+
+        key = None
+        if self.cache is not None:
+            with handwriting.timed_stage(timings, "lookup"):
+                key = self.cache.key(frame, key_mode, self.recognizer_id)
+                cached = self.cache.get(key)
+            if cached is not None:
+                image, text, confidence, chars = cached
+                return Recognition(text, confidence, {"image": image, "chars": chars, "timings": timings, "cached": True})
+
+        if word:
+            image = preprocess(frame, timings)
+            with handwriting.timed_stage(timings, "word_ocr"):
+                text, confidence, chars = self.read_word(image) if image is not None else ("", 0, [])
+        else:
+            # Classify the bare ink first; the expensive preprocessing only runs for Tesseract
+            glyph = None
+            if self.classifier is not None:
+                if key_mode == "strokes":
+                    with handwriting.timed_stage(timings, "glyph"):
+                        glyph = handwriting.stroke_glyph(json_data)
+                else:
+                    glyph = handwriting.letter_glyph(frame, timings)
+            with handwriting.timed_stage(timings, "classify"):
+                text, confidence = self.classify_letter(glyph)
+            image = glyph
+            if confidence < self.min_confidence and self.letter_engine is not None:
+                image = preprocess(frame, timings)
+                if image is not None:
+                    with handwriting.timed_stage(timings, "letter_ocr"):
+                        text, confidence = self.ocr_letter(image)
+            chars = [(text, confidence)] if text else []
+        if key is not None:
+            self.cache.put(key, (image, text, confidence, chars))
+        return Recognition(text, confidence, {"image": image, "chars": chars, "timings": timings, "cached": False})
+
+
+def create_recognizer(cache=None):
+    """Build a recognizer from the exported letter model and Tesseract, whichever are available."""
+    from letter_classifier import DEFAULT_MODEL_PATH, load_classifier
+
+    classifier = load_classifier(os.environ.get("LETTER_MODEL_PATH", DEFAULT_MODEL_PATH))
+    letter_engine = line_engine = None
+    try:
+        import ocr_engine
+        import pytesseract
+
+        if os.environ.get("TESSERACT_CMD"):
+            pytesseract.pytesseract.tesseract_cmd = os.environ["TESSERACT_CMD"]
+        if not ocr_engine.probe_tesserocr()[0]:
+            pytesseract.get_tesseract_version()
+        letter_engine = ocr_engine.create_engine(size=1)
+        line_engine = ocr_engine.create_engine(size=1, psm=ocr_engine.LINE_PSM)
+    except Exception:
+        pass  # Classifier only
+    return Recognizer(classifier, letter_engine, line_engine, cache)
+
+
+def load_image(path):
+    """Read a scan as an RGBA uint8 array, the layout of a canvas frame."""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGBA"))
+
+
+# Batch worksheets: one warm recognizer per worker process
+
+_recognizer = None
+
+
+def _init_worker():
+    global _recognizer
+    _recognizer = create_recognizer()
+    # Warm up the engines so the first image does not pay for starting Tesseract
+    blank = np.full((100, 100), 255, np.uint8)
+    if _recognizer.letter_engine is not None:
+        _recognizer.letter_engine.recognize(blank)
+        _recognizer.line_engine.recognize_chars(blank)
+
+
+def _recognize_file(args):
+    path, word, mode = args
+    start = time.perf_counter()
+    try:
+        result = _recognizer.recognize(load_image(path), word=word, mode=mode)
+        text, confidence, error = result.text, float(result.confidence), ""
+    except Exception as e:
+        text, confidence, error = "", 0.0, f"{type(e).__name__}: {e}"
+    return path, text, confidence, time.perf_counter() - start, error
+
+
+def list_images(directory):
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def label_from_name(path):
+    """Expected text from a file name such as ``cat_student7.png`` -> ``cat``."""
+    return os.path.splitext(os.path.basename(path))[0].split("_")[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recognize a directory of handwritten worksheet scans.")
+    parser.add_argument("directory")
+    parser.add_argument("--word", action="store_true", help="images hold words, not single letters")
+    parser.add_argument("--mode", choices=handwriting.PREPROCESS_MODES, default=None,
+                        help="letter preprocessing mode (default: OCR_PREPROCESS or crop)")
+    parser.add_argument("--workers", type=int, default=None, help="recognition processes (default: all cores)")
+    parser.add_argument("--out", help="write path, text, confidence and milliseconds per image to this CSV")
+    parser.add_argument("--label-from-name", action="store_true",
+                        help="report accuracy against the file name prefix before the first '_'")
+    args = parser.parse_args(argv)
+
+    paths = list_images(args.directory)
+    if not paths:
+        print(f"No images found in {args.directory}", file=sys.stderr)
+        return 1
+    workers = args.workers or os.cpu_count()
+    jobs = [(path, args.word, args.mode) for path in paths]
+
+    start = time.perf_counter()
+    if workers <= 1:
+        _init_worker()
+        results = [_recognize_file(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker) as pool:
+            results = list(pool.map(_recognize_file, jobs, chunksize=max(1, min(32, len(jobs) // (workers * 4)))))
+    seconds = time.perf_counter() - start
+
+    if args.out:
+        with open(args.out, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["path", "text", "confidence", "ms", "error"])
+            for path, text, confidence, image_seconds, error in results:
+                writer.writerow([path, text, f"{confidence:.1f}", f"{image_seconds * 1000:.1f}", error])
+
+    errors = sum(1 for *_, error in results if error)
+    print(f"Recognized {len(results)} images in {seconds:.1f}s "
+          f"({len(results) / max(seconds, 1e-9):.1f} images/s, {workers} workers); {errors} errors")
+    if args.label_from_name:
+        correct = sum(1 for path, text, *_ in results if text.lower() == label_from_name(path).lower())
+        print(f"Accuracy: {correct}/{len(results)} ({correct / len(results):.1%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""Spaced-repetition scheduling of lesson items (SM-2).
+
+Each learner gets one ``ReviewScheduler`` per level. It refers to the shared
+tuple of item ids from the content store and keeps per-item state only for
+items the learner has actually seen, in compact typed arrays indexed by a
+slot number. A heap of ``(due time, slot)`` entries orders reviews; entries
+made stale by a later grade are skipped lazily instead of being removed.
+
+* ``next_item`` returns the most overdue item, or introduces a new one when
+  nothing is due: amortized O(log n).
+* ``grade`` applies the SM-2 update in O(1) and pushes one heap entry.
+
+Items a learner has never seen cost nothing, so banks of 100k items and
+thousands of concurrent learners fit comfortably in memory. New items are
+introduced in a per-learner pseudo-random order generated from a start and
+a stride, so no shuffled copy of the bank is stored.
+"""
+import heapq
+import math
+import random
+import time
+from array import array
+
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+DAY = 86400.0
+# Missed or skipped items come back after this many seconds
+RELEARN_DELAY = 60.0
+
+
+class ReviewScheduler:
+    """SM-2 scheduler over a shared, ordered bank of item ids."""
+
+    __slots__ = (
+        "item_ids", "_slots", "_slot_ids", "_ease", "_interval", "_reps", "_due",
+        "_heap", "_introduced", "_start", "_stride", "_upcoming",
+    )
+
+    def __init__(self, item_ids, seed=None):
+        self.item_ids = item_ids
+        self._slots = {}  # item id -> slot in the arrays below
+        self._slot_ids = array("q")
+        self._ease = array("f")
+        self._interval = array("f")  # seconds
+        self._reps = array("H")
+        self._due = array("d")
+        self._heap = []
+        self._introduced = 0
+        self._upcoming = None  # (current, guess) until the schedule next changes
+        rng = random.Random(seed)
+        n = max(1, len(item_ids))
+        self._start = rng.randrange(n)
+        stride = rng.randrange(1, n) if n > 1 else 1
+        while math.gcd(stride, n) != 1:
+            stride += 1
+        self._stride = stride
+
+    def __len__(self):
+        """Number of items the learner has seen so far."""
+        return len(self._slot_ids)
+
+    def _slot_for(self, item_id, now):
+        slot = self._slots.get(item_id)
+        if slot is None:
+            slot = len(self._slot_ids)
+            self._slots[item_id] = slot
+            self._slot_ids.append(item_id)
+            self._ease.append(INITIAL_EASE)
+            self._interval.append(0.0)
+            self._reps.append(0)
+            self._due.append(now)
+        return slot
+
+    def _peek_due(self):
+        """Return the valid heap top as (due, slot), discarding stale entries."""
+        heap = self._heap
+        while heap:
+            due, slot = heap[0]
+            if self._due[slot] == due:
+                return due, slot
+            heapq.heappop(heap)
+        return None
+
+    def _new_item(self):
+        n = len(self.item_ids)
+        while self._introduced < n:
+            index = (self._start + self._introduced * self._stride) % n
+            self._introduced += 1
+            item_id = self.item_ids[index]
+            if item_id not in self._slots:
+                return item_id
+        return None
+
+    def next_item(self, now=None):
+        """Return the id of the item to show next."""
+        now = time.time() if now is None else now
+        top = self._peek_due()
+        if top is not None and top[0] <= now:
+            return self._slot_ids[top[1]]
+        item_id = self._new_item()
+        if item_id is not None:
+            self._schedule(self._slot_for(item_id, now), now)
+            return item_id
+        if top is not None:
+            return self._slot_ids[top[1]]  # Nothing due: review ahead of schedule
+        return None
+
+    def upcoming(self, current=None, now=None):
+        """Guess the item shown after ``current`` without changing any state.
+
+        Returns the most overdue other item, or the next new one; meant for
+        prefetching, so it may differ from what ``next_item`` later returns.
+        The guess is kept until the next ``grade``, ``postpone`` or new item,
+        so the reruns in between cost a tuple comparison.
+        """
+        if self._upcoming is not None and self._upcoming[0] == current:
+            return self._upcoming[1]
+        now = time.time() if now is None else now
+        guess = None
+        for due, slot in heapq.nsmallest(4, self._heap):
+            if due > now:
+                break
+            if self._due[slot] == due and self._slot_ids[slot] != current:
+                guess = self._slot_ids[slot]
+                break
+        n = len(self.item_ids)
+        for introduced in range(self._introduced, n if guess is None else 0):
+            item_id = self.item_ids[(self._start + introduced * self._stride) % n]
+            if item_id not in self._slots:
+                guess = item_id
+                break
+        self._upcoming = current, guess
+        return guess
+
+    def _schedule(self, slot, due):
+        self._upcoming = None
+        self._due[slot] = due
+        heapq.heappush(self._heap, (self._due[slot], slot))
+        if len(self._heap) > 2 * len(self._slot_ids) + 64:
+            # Drop stale entries once they outnumber live ones; amortized O(1) per grade
+            self._heap = [(d, s) for d, s in self._heap if self._due[s] == d]
+            heapq.heapify(self._heap)
+
+    def grade(self, item_id, correct, now=None, quality=None):
+        """Record an answer and reschedule the item with the SM-2 rules.
+
+        ``quality`` is the SM-2 score from 0 to 5; by default a correct
+        answer counts as 4 and a wrong one as 1.
+        """
+        now = time.time() if now is None else now
+        slot = self._slot_for(item_id, now)
+        q = quality if quality is not None else (4 if correct else 1)
+        if q < 3:
+            self._reps[slot] = 0
+            self._interval[slot] = RELEARN_DELAY
+        else:
+            reps = min(self._reps[slot] + 1, 65535)
+            self._reps[slot] = reps
+            if reps == 1:
+                self._interval[slot] = DAY
+            elif reps == 2:
+                self._interval[slot] = 6 * DAY
+            else:
+                self._interval[slot] = self._interval[slot] * self._ease[slot]
+        self._ease[slot] = max(MIN_EASE, self._ease[slot] + 0.1 - (5 - q) * (0.08 + (5 - q) * 0.02))
+        self._schedule(slot, now + self._interval[slot])
+
+    def postpone(self, item_id, now=None, delay=RELEARN_DELAY):
+        """Push an item back without changing its ease, e.g. when it is skipped."""
+        now = time.time() if now is None else now
+        self._schedule(self._slot_for(item_id, now), now + delay)
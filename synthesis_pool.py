@@ -0,0 +1,70 @@
+"""Background speech synthesis on one bounded, process-wide thread pool.
+
+A rerun asks for audio with ``submit`` and gets a ``Future`` back instead of
+waiting on the TTS service, so the page renders while the clip is made.
+Requests for a key that is already being synthesized share one future, so
+many sessions opening the same lesson cause one render. Finished clips land
+in the shared ``AudioCache``; the pool only tracks work in flight.
+
+Speculative requests (prefetching the next item's audio) are dropped once
+``max_pending`` jobs are queued, so prefetching never delays audio that a
+learner is waiting for by more than that backlog.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 32
+
+
+class SynthesisPool:
+    """Deduplicating executor that renders audio into an ``AudioCache``."""
+
+    def __init__(self, cache, max_workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+        self.cache = cache
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="tts")
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.deduplicated = 0
+        self.dropped = 0
+
+    def submit(self, key, render, speculative=False):
+        """Return a future for ``key``'s audio, starting ``render()`` unless it is already running.
+
+        Returns None when a ``speculative`` request is dropped because the
+        pool is busy.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                return future
+            if speculative and len(self._futures) >= self.max_pending:
+                self.dropped += 1
+                return None
+            future = self._executor.submit(self.cache.get_or_create, key, render)
+            self._futures[key] = future
+            self.submitted += 1
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key, future):
+        # The clip is in the cache now (or failed); later requests start afresh
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+
+    def stats(self):
+        """Return job counters and the number of jobs in flight."""
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "deduplicated": self.deduplicated,
+                "dropped": self.dropped,
+                "pending": len(self._futures),
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,39 @@
+"""End-to-end checks of the Streamlit app through AppTest."""
+import os
+import re
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from lessons import SENTENCES
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # Keep progress, audio and events out of the real files; no network for TTS
+    monkeypatch.setenv("PROGRESS_DB", str(tmp_path / "progress.db"))
+    monkeypatch.setenv("TTS_CACHE_DIR", str(tmp_path / "tts"))
+    monkeypatch.setenv("ANALYTICS_LOG", str(tmp_path / "class_events.jsonl"))
+    monkeypatch.setenv("TTS_BACKEND", "stub")
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    assert not at.exception
+    return at
+
+
+def test_correct_sentence_answer_earns_xp(app):
+    app.selectbox(key="main_level_select").select("Level 3 - Sentences").run()
+    prompt = next(m.value for m in app.markdown if m.value.startswith("Complete the sentence:"))
+    sentence = re.search(r"\*\*(.+)\*\*", prompt).group(1)
+    answer = next(s["answer"] for s in SENTENCES if s["sentence"] == sentence)
+    user = app.session_state["user"]
+    before = (user.level, user.xp)
+
+    app.text_input(key="sentence_input").input(answer)
+    next(b for b in app.button if b.label == "Check Answer").click().run()
+
+    assert not app.exception
+    user = app.session_state["user"]
+    assert (user.level, user.xp) > before
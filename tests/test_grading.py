@@ -0,0 +1,25 @@
+"""Bulk grading of submission CSVs."""
+import io
+
+from content_store import ContentStore
+from grading import BatchGrader
+
+
+def test_non_numeric_item_id_counts_as_unknown():
+    store = ContentStore()
+    item_id = store.ids(3)[0]
+    answer = store.get(item_id)["answer"]
+    submissions = io.StringIO(
+        "student_id,item_id,answer\n"
+        f"ana,{item_id},{answer}\n"
+        f"ana,sentence-{item_id},{answer}\n"
+        f"ben,,{answer}\n"
+        f"ben,{item_id},{answer}\n"
+    )
+
+    grader = BatchGrader(workers=1)
+    grader.grade_csv(submissions)
+
+    assert grader.unknown == 2
+    assert grader.rows == 2
+    assert {sid: s.correct for sid, s in grader.students.items()} == {"ana": 1, "ben": 1}
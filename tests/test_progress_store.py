@@ -0,0 +1,25 @@
+"""Learner progress surviving a restart of the write-behind store."""
+from progress_store import ProgressStore, User
+
+
+def test_progress_survives_reopening_the_store(tmp_path):
+    path = str(tmp_path / "progress.db")
+    # The flush thread never fires on its own; only close() commits the buffer
+    store = ProgressStore(path, flush_interval=3600)
+    user = User("ana", store)
+    for _ in range(6):
+        user.earn_xp(2)
+        user.maintain_streak(True)
+    User("ben", store).earn_xp(3)
+    assert store.stats() == {"pending": 2, "flushes": 0, "rows_written": 0}
+    store.close()
+    assert store.stats() == {"pending": 0, "flushes": 1, "rows_written": 2}
+
+    reopened = ProgressStore(path, flush_interval=3600)
+    try:
+        user = User("ana", reopened)
+        assert (user.level, user.xp, user.streak) == (2, 2, 6)
+        assert reopened.load("ben") == (3, 1, 0)
+        assert reopened.load("carl") is None
+    finally:
+        reopened.close()
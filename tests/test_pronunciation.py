@@ -0,0 +1,49 @@
+"""Pronunciation scores separate the right utterance from the wrong ones."""
+import io
+import wave
+
+import numpy as np
+
+from pronunciation import SAMPLE_RATE, PronunciationScorer
+
+# First two formants (Hz) of a few vowels; a sequence of them stands in for a word
+VOWELS = {"a": (730, 1090), "e": (530, 1840), "i": (270, 2290), "o": (570, 840), "u": (300, 870)}
+TEXTS = ["aiu", "uoe", "eia", "oua"]
+CLOSE_SCORE = 50  # The app's "almost there" (SPEAKING_CLOSE)
+
+
+def utterance(vowels, pitch=120, seconds=0.2, volume=0.5):
+    """Return a WAV of harmonics at ``pitch`` shaped by each vowel's formants in turn."""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    harmonics = np.arange(1, int(4000 / pitch)) * pitch
+    parts = []
+    for vowel in vowels:
+        f1, f2 = VOWELS[vowel]
+        amplitudes = np.exp(-((harmonics - f1) / 120) ** 2) + 0.5 * np.exp(-((harmonics - f2) / 150) ** 2) + 0.02
+        parts.append((amplitudes[:, None] * np.sin(2 * np.pi * harmonics[:, None] * t)).sum(axis=0))
+    silence = np.zeros(SAMPLE_RATE // 10)
+    samples = np.concatenate([silence, *parts, silence])
+    samples *= volume / np.abs(samples).max()
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((samples * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def test_matching_utterances_outscore_mismatches():
+    references = {text: utterance(text) for text in TEXTS}
+    scorer = PronunciationScorer(references.__getitem__)
+    mismatch_scores = []
+    for text in TEXTS:
+        # A different speaker: higher pitch, slower and quieter
+        attempt = utterance(text, pitch=190, seconds=0.27, volume=0.2)
+        match = scorer.score(attempt, text)
+        others = [scorer.score(attempt, other) for other in TEXTS if other != text]
+
+        assert match.score == 100
+        assert match.distance < min(other.distance for other in others)
+        mismatch_scores += [other.score for other in others]
+    assert np.mean(mismatch_scores) < CLOSE_SCORE
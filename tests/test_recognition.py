@@ -0,0 +1,56 @@
+"""Letter and word recognition through the real canvas preprocessing path."""
+import string
+
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("PIL")
+
+from benchmarks.canvases import LETTER_CANVAS, WORD_CANVAS, canvas_set, canvas_strokes  # noqa: E402
+from lessons import WORDS  # noqa: E402
+from letter_classifier import find_fonts, synthesize_dataset, train  # noqa: E402
+from recognition import Recognizer  # noqa: E402
+
+MIN_ACCURACY = 0.8
+# Whole words read correctly; dilating before segmentation brought this to 0.45
+MIN_WORD_ACCURACY = 0.55
+# Letters drawn as strokes; classifying the thickened OCR raster read 0.6
+MIN_STROKE_ACCURACY = 0.75
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    if not find_fonts(limit=1):
+        pytest.skip("no system fonts to train the letter classifier on")
+    glyphs, labels = synthesize_dataset(find_fonts(limit=8), samples_per_glyph=15)
+    return train(glyphs, labels, epochs=15)
+
+
+def test_classifier_reads_canvas_letters(classifier):
+    # Classifier only: a wrong preprocessing input cannot hide behind the Tesseract fallback
+    recognizer = Recognizer(classifier)
+    frames = canvas_set(list(string.ascii_lowercase), LETTER_CANVAS, 78, seed=1)
+    results = [(text, recognizer.recognize(frame, mode="crop")) for text, frame in frames]
+
+    accuracy = sum(result.text == text for text, result in results) / len(results)
+    assert accuracy >= MIN_ACCURACY
+    assert all("letter_ocr" not in result.debug["timings"] for _, result in results)
+
+
+def test_classifier_reads_canvas_strokes(classifier, monkeypatch):
+    monkeypatch.setenv("CANVAS_INPUT", "strokes")
+    recognizer = Recognizer(classifier)
+    frames = canvas_set(list(string.ascii_lowercase), LETTER_CANVAS, 52, seed=3)
+    results = [(text, recognizer.recognize(None, json_data=canvas_strokes(frame))) for text, frame in frames]
+
+    accuracy = sum(result.text == text for text, result in results) / len(results)
+    assert accuracy >= MIN_STROKE_ACCURACY
+
+
+def test_classifier_reads_canvas_words(classifier):
+    recognizer = Recognizer(classifier)
+    frames = canvas_set([word.lower() for word in WORDS], WORD_CANVAS, 40, seed=2)
+    results = [(text, recognizer.recognize(frame, word=True)) for text, frame in frames]
+
+    accuracy = sum(result.text == text for text, result in results) / len(results)
+    assert accuracy >= MIN_WORD_ACCURACY